@@ -5,8 +5,17 @@ TranscriptBot - Complete Audio Processing Pipeline
 - Extracts audio from videos
 - Transcribes audio files with Whisper (auto language detection)
 - Creates AI-powered summaries
+
+Usage:
+    python run_pipeline.py          # run the complete pipeline
+    python run_pipeline.py plan     # dry run: list pending work and estimated cost
+    python run_pipeline.py search "query"  # full-text search over transcripts/summaries/TODOs
+    python run_pipeline.py digest --pattern "*thesis-coaching*"  # digest of many meetings
+    python run_pipeline.py live --wait --summarize  # transcribe an OBS recording while it runs
+    python run_pipeline.py retention --apply  # compress/delete intermediates of transcribed recordings
 """
 
+import argparse
 import subprocess
 import sys
 from pathlib import Path
@@ -86,8 +95,8 @@ def check_prerequisites():
     
     return len(audio_files) > 0 or len(video_files) > 0 or len(music_files) > 0 or len(obs_files) > 0
 
-def main():
-    """Main pipeline function"""
+def run_pipeline():
+    """Run all pipeline stages"""
     print("🤖 TRANSCRIPTBOT - COMPLETE AUDIO PROCESSING PIPELINE")
     print("=" * 60)
     print("This pipeline will:")
@@ -184,5 +193,44 @@ def main():
     print("   - Use GitHub Copilot or ChatGPT Plus for additional analysis")
     print("=" * 60)
 
+def main(argv=None) -> int:
+    """Dispatch pipeline commands"""
+    parser = argparse.ArgumentParser(description="TranscriptBot audio processing pipeline")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("run", help="run the complete pipeline (default)")
+    subparsers.add_parser("plan", add_help=False, help="dry run: list pending work and estimated cost")
+    subparsers.add_parser("search", add_help=False, help="full-text search over transcripts, summaries and TODOs")
+    subparsers.add_parser("digest", add_help=False, help="combine existing summaries into a multi-meeting digest")
+    subparsers.add_parser("live", add_help=False, help="transcribe an OBS recording while it is being recorded")
+    subparsers.add_parser("retention", add_help=False, help="compress/delete intermediates of transcribed recordings")
+    args, rest = parser.parse_known_args(argv)
+
+    # Commands implemented in src/ are imported in-process; they never load torch/whisper/openai
+    sys.path.insert(0, str(SRC_DIR))
+
+    if args.command == "plan":
+        from plan_pipeline import main as plan_main
+        return plan_main(rest)
+    if args.command == "search":
+        from search_index import main as search_main
+        return search_main(rest)
+    if args.command == "digest":
+        from create_digest import main as digest_main
+        return digest_main(rest)
+    if args.command == "live":
+        from live_transcribe import main as live_main
+        return live_main(rest)
+    if args.command == "retention":
+        from retention import main as retention_main
+        return retention_main(rest)
+
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    # The LLM stages run as subprocesses; the run id makes them share one budget
+    from token_budget import start_run
+    print(f"🧾 Run id: {start_run()}")
+    run_pipeline()
+    return 0
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
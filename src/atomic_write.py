@@ -0,0 +1,38 @@
+"""
+Crash-safe file writes
+Transcripts, checkpoints, indexes and ledgers are written to a temp file
+next to the target, flushed to disk and renamed over it. A run killed at
+any moment leaves either the old or the new file, never a partial one.
+"""
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Optional
+
+def temp_path_for(path: Path) -> Path:
+    """Hidden temp file in the target's directory, unique per process"""
+    return path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "w", encoding: Optional[str] = "utf-8") -> Iterator[IO]:
+    """Open a temp file for writing and replace path with it once the block succeeds
+
+    Use mode "wb" for binary writers (gzip, numpy). If the block raises,
+    the temp file is removed and path is left untouched.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = temp_path_for(path)
+    try:
+        with tmp_path.open(mode, encoding=None if "b" in mode else encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+def atomic_write_text(path: Path, text: str):
+    """Write text (UTF-8) to path atomically"""
+    with atomic_write(path) as f:
+        f.write(text)
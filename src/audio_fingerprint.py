@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Acoustic fingerprints for finding the same meeting recorded twice
+(e.g. OBS recording and phone recording copied from ~/Music). A byte hash
+can't match different encodings, so spectral peaks of the decoded 16 kHz
+audio are paired into (f1, f2, dt) landmark hashes; two recordings match
+when many hashes agree on one time offset. Only the best-quality member
+of each group is transcribed, the others are linked to its transcript
+via data/index/duplicates.json.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from atomic_write import atomic_write, atomic_write_text
+from audio_loader import SAMPLE_RATE, read_wav_header, open_pcm, decoded_pcm, pcm_to_float
+from constants import INDEX_DIR
+
+FINGERPRINT_DIR = INDEX_DIR / "fingerprints"
+DUPLICATES_PATH = INDEX_DIR / "duplicates.json"
+
+# Spectrogram: 64 ms frames, 32 ms hop
+FRAME_SIZE = 1024
+HOP_SIZE = 512
+BLOCK_FRAMES = 2048  # frames analysed at once (~65 s) to bound memory
+# Frames quieter than this are digital silence (muted mic, zero padding), not a noise floor
+DIGITAL_SILENCE_DB = -90.0
+# Bumped when the cached fingerprint contents change meaning
+FINGERPRINT_VERSION = 2
+# Frequency bands (FFT bins, ~150 Hz - 4 kHz) - one peak candidate per band and frame
+BAND_EDGES = [10, 20, 40, 80, 160, 256]
+# Landmark pairs: each peak is paired with the next FAN_OUT peaks within MAX_DT frames
+FAN_OUT = 3
+MAX_DT = 63
+
+# Two recordings are duplicates when this many hashes agree on one offset
+MIN_MATCHES = 30
+MIN_MATCH_RATIO = 0.02
+# Candidates shorter than this fraction of the longest group member are never chosen
+MIN_COVERAGE = 0.9
+# A covering recording that is already transcribed is kept unless a new one is this much cleaner
+RETRANSCRIBE_SNR_MARGIN_DB = 10.0
+
+class Fingerprint:
+    """Landmark hashes of one recording plus cheap quality metrics"""
+
+    def __init__(self, hashes, times, snr_db: float, duration: float):
+        self.hashes = hashes
+        self.times = times
+        self.snr_db = snr_db
+        self.duration = duration
+
+def _block_peaks(samples):
+    """Return (frame index, bin) of spectral peaks and per-frame RMS for one block"""
+    import numpy as np
+
+    if len(samples) < FRAME_SIZE:
+        return np.zeros(0, np.int32), np.zeros(0, np.int32), np.zeros(0, np.float32)
+    frames = np.lib.stride_tricks.sliding_window_view(samples, FRAME_SIZE)[::HOP_SIZE]
+    rms = np.sqrt(np.mean(frames ** 2, axis=1) + 1e-12)
+    spectrum = np.log(np.abs(np.fft.rfft(frames * np.hanning(FRAME_SIZE), axis=1)) + 1e-9)
+
+    peak_frames, peak_bins = [], []
+    for low, high in zip(BAND_EDGES[:-1], BAND_EDGES[1:]):
+        band = spectrum[:, low:high]
+        values = band.max(axis=1)
+        bins = band.argmax(axis=1) + low
+        # Keep peaks that stand out in this band and are local maxima in time
+        previous = np.concatenate(([-np.inf], values[:-1]))
+        following = np.concatenate((values[1:], [-np.inf]))
+        keep = (values > values.mean() + values.std() * 0.5) & (values >= previous) & (values >= following)
+        peak_frames.append(np.nonzero(keep)[0])
+        peak_bins.append(bins[keep])
+    return np.concatenate(peak_frames), np.concatenate(peak_bins), rms
+
+def compute_fingerprint(pcm) -> Fingerprint:
+    """Fingerprint int16 samples (memory-mapped or in RAM) block by block"""
+    import numpy as np
+
+    block_samples = BLOCK_FRAMES * HOP_SIZE
+    all_frames, all_bins, all_rms = [], [], []
+    for start in range(0, len(pcm), block_samples):
+        samples = pcm_to_float(pcm[start:start + block_samples + FRAME_SIZE - HOP_SIZE])
+        frames, bins, rms = _block_peaks(samples)
+        all_frames.append(frames + start // HOP_SIZE)
+        all_bins.append(bins)
+        all_rms.append(rms[:BLOCK_FRAMES])
+
+    frames = np.concatenate(all_frames) if all_frames else np.zeros(0, np.int64)
+    bins = np.concatenate(all_bins) if all_bins else np.zeros(0, np.int64)
+    order = np.lexsort((bins, frames))
+    frames, bins = frames[order].astype(np.int64), bins[order].astype(np.int64)
+
+    hashes, times = [], []
+    for k in range(1, FAN_OUT + 1):
+        dt = frames[k:] - frames[:-k]
+        valid = (dt > 0) & (dt <= MAX_DT)
+        hashes.append((bins[:-k][valid] << 17) | (bins[k:][valid] << 8) | dt[valid])
+        times.append(frames[:-k][valid])
+
+    # Loud frames against the noise floor; digital silence would make any recording look clean
+    rms_db = 20 * np.log10(np.concatenate(all_rms)) if all_rms else np.zeros(0)
+    rms_db = rms_db[rms_db > DIGITAL_SILENCE_DB]
+    snr_db = float(np.percentile(rms_db, 90) - np.percentile(rms_db, 10)) if len(rms_db) else 0.0
+    return Fingerprint(
+        np.concatenate(hashes).astype(np.uint32) if hashes else np.zeros(0, np.uint32),
+        np.concatenate(times).astype(np.int32) if times else np.zeros(0, np.int32),
+        snr_db,
+        len(pcm) / SAMPLE_RATE,
+    )
+
+def fingerprint_file(audio_path: Path) -> Optional[Fingerprint]:
+    """Fingerprint a file, reusing the cached result while the file is unchanged
+
+    Cached fingerprints stay usable after the audio was removed by the
+    retention policy, so new recordings can still be matched against it.
+    """
+    import numpy as np
+
+    cache_path = FINGERPRINT_DIR / f"{audio_path.stem}.npz"
+    stat = audio_path.stat() if audio_path.exists() else None
+    if cache_path.exists():
+        with np.load(cache_path) as cached:
+            current = "version" in cached.files and cached["version"] == FINGERPRINT_VERSION
+            if stat is None or (current and cached["size"] == stat.st_size and cached["mtime"] == stat.st_mtime):
+                return Fingerprint(cached["hashes"], cached["times"],
+                                   float(cached["snr_db"]), float(cached["duration"]))
+    if stat is None:
+        return None
+
+    try:
+        if read_wav_header(audio_path):
+            fingerprint = compute_fingerprint(open_pcm(audio_path))
+        else:
+            with decoded_pcm(audio_path) as pcm:
+                fingerprint = compute_fingerprint(pcm)
+    except Exception as e:
+        print(f"⚠️  Could not fingerprint {audio_path.name}: {e}")
+        return None
+
+    with atomic_write(cache_path, "wb") as f:
+        np.savez_compressed(f, hashes=fingerprint.hashes, times=fingerprint.times,
+                            snr_db=fingerprint.snr_db, duration=fingerprint.duration,
+                            size=stat.st_size, mtime=stat.st_mtime, version=FINGERPRINT_VERSION)
+    return fingerprint
+
+def cached_fingerprint_stems() -> List[str]:
+    """Stems of all recordings with a cached fingerprint (audio may be gone already)"""
+    if not FINGERPRINT_DIR.exists():
+        return []
+    return sorted(p.stem for p in FINGERPRINT_DIR.glob("*.npz") if not p.name.startswith("."))
+
+def match_score(a: Fingerprint, b: Fingerprint) -> int:
+    """Number of landmark hashes that agree on the best time offset (±1 frame)"""
+    import numpy as np
+
+    hashes_a, first_a = np.unique(a.hashes, return_index=True)
+    hashes_b, first_b = np.unique(b.hashes, return_index=True)
+    _, index_a, index_b = np.intersect1d(hashes_a, hashes_b, assume_unique=True, return_indices=True)
+    if len(index_a) < MIN_MATCHES:
+        return 0
+    offsets = b.times[first_b[index_b]].astype(np.int64) - a.times[first_a[index_a]]
+    counts = np.bincount(offsets - offsets.min())
+    return int(np.convolve(counts, [1, 1, 1], mode="same").max())
+
+def is_duplicate(a: Fingerprint, b: Fingerprint) -> bool:
+    """True if both fingerprints come from the same recording"""
+    smaller = min(len(a.hashes), len(b.hashes))
+    if smaller == 0:
+        return False
+    return match_score(a, b) >= max(MIN_MATCHES, MIN_MATCH_RATIO * smaller)
+
+def load_duplicates() -> Dict[str, str]:
+    """Return {duplicate stem: canonical stem}"""
+    if not DUPLICATES_PATH.exists():
+        return {}
+    try:
+        return json.loads(DUPLICATES_PATH.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+
+def save_duplicates(duplicates: Dict[str, str]):
+    """Write the duplicate manifest atomically"""
+    atomic_write_text(DUPLICATES_PATH, json.dumps(duplicates, indent=2, ensure_ascii=False, sort_keys=True))
+
+def linked_stems(stem: str) -> List[str]:
+    """The stem followed by all stems it is linked to (a -> b -> c gives [a, b, c])"""
+    duplicates = load_duplicates()
+    chain = [stem]
+    while duplicates.get(chain[-1]) and duplicates[chain[-1]] not in chain:
+        chain.append(duplicates[chain[-1]])
+    return chain
+
+def canonical_stem(stem: str) -> Optional[str]:
+    """Stem of the recording whose outputs a duplicate is linked to (end of the chain)"""
+    chain = linked_stems(stem)
+    return chain[-1] if len(chain) > 1 else None
+
+def find_duplicates(pending: List[Path], transcribed: List[Path]) -> Dict[str, str]:
+    """Group pending recordings with each other and with transcribed ones
+
+    Returns {duplicate stem: canonical stem}. Only members covering (nearly)
+    the whole meeting are candidates. An existing transcript is reused if
+    its recording is such a candidate and not much noisier than the best
+    one; the pending members are then linked to the stem that owns that
+    transcript. Otherwise the pending candidate with the best
+    signal-to-noise estimate is transcribed and the other members -
+    including already transcribed snippets - are linked to it.
+    """
+    from transcribe_batch import existing_transcript
+
+    fingerprints = {}
+    for path in pending + transcribed:
+        fingerprint = fingerprint_file(path)
+        if fingerprint is not None:
+            fingerprints[path] = fingerprint
+
+    # Union-find over all matching pairs that involve a pending recording
+    parent = {path: path for path in fingerprints}
+
+    def root(path):
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+
+    candidates = [p for p in pending if p in fingerprints]
+    others = [p for p in fingerprints if p not in candidates]
+    for i, a in enumerate(candidates):
+        for b in candidates[i + 1:] + others:
+            if root(a) != root(b) and is_duplicate(fingerprints[a], fingerprints[b]):
+                parent[root(b)] = root(a)
+
+    groups: Dict[Path, List[Path]] = {}
+    for path in fingerprints:
+        groups.setdefault(root(path), []).append(path)
+
+    def quality(path):
+        return fingerprints[path].snr_db, fingerprints[path].duration
+
+    duplicates = {}
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        longest = max(fingerprints[m].duration for m in members)
+        eligible = [m for m in members if fingerprints[m].duration >= MIN_COVERAGE * longest]
+        best = max(eligible, key=quality)
+        owners = {m: existing_transcript(m) for m in eligible if m in transcribed}
+        owners = {m: t for m, t in owners.items() if t is not None
+                  and fingerprints[m].snr_db + RETRANSCRIBE_SNR_MARGIN_DB >= fingerprints[best].snr_db}
+        if owners:
+            canonical = owners[max(owners, key=quality)].stem.rsplit("_", 1)[0]
+            linked = [m for m in members if m in pending]
+        else:
+            canonical = max([m for m in eligible if m in pending] or eligible, key=quality).stem
+            linked = members
+        for member in linked:
+            if member.stem != canonical:
+                duplicates[member.stem] = canonical
+    return duplicates
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Report duplicate recordings in data/audio"""
+    parser = argparse.ArgumentParser(description="Find the same recording in different encodings")
+    parser.parse_args(argv)
+
+    from transcribe_batch import find_audio_files
+
+    audio_files = sorted(find_audio_files())
+    print(f"🔎 Fingerprinting {len(audio_files)} audio files...")
+    duplicates = find_duplicates(audio_files, [])
+    if not duplicates:
+        print("✅ No duplicate recordings found")
+        return 0
+    for duplicate, canonical in sorted(duplicates.items()):
+        print(f"🔗 {duplicate} duplicates {canonical}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
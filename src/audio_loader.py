@@ -0,0 +1,258 @@
+"""
+Windowed audio loading for Whisper
+The WAVs written by extract_audio_from_videos.py are already 16 kHz mono
+pcm_s16le - exactly what Whisper expects. Instead of letting Whisper spawn
+ffmpeg again and hold the whole recording as one float32 array, the PCM
+data is memory-mapped and converted one 30 s window at a time, so memory
+per file stays constant regardless of recording length.
+
+Other formats (e.g. FLAC/Opus intermediates, phone recordings) are decoded
+once by ffmpeg into a temporary raw PCM file and memory-mapped the same way.
+That file lives in data/tmp, because /tmp is often a tmpfs where it would
+occupy RAM (about 115 MB per hour of audio).
+"""
+
+import shutil
+import struct
+import subprocess
+import tempfile
+import wave
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from constants import TMP_DIR, VOICE_ACTIVITY_DETECTION
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2  # pcm_s16le
+
+# Whisper works on 30 s windows; the tail of each window is transcribed again
+# with the next one so words at the window boundary are not cut
+WINDOW_SECONDS = 30
+HOLDBACK_SECONDS = 5
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+def read_wav_header(path: Path) -> Optional[Tuple[int, int]]:
+    """Return (data offset, number of samples) for 16 kHz mono s16le WAVs, else None"""
+    if path.suffix.lower() != ".wav":
+        return None
+    file_size = path.stat().st_size
+    with path.open("rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            return None
+        pcm_format_ok = False
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+            if chunk_id == b"fmt ":
+                fmt = f.read(chunk_size)
+                if len(fmt) < 16:
+                    return None
+                audio_format, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+                pcm_format_ok = (audio_format in (WAVE_FORMAT_PCM, WAVE_FORMAT_EXTENSIBLE)
+                                 and channels == 1 and sample_rate == SAMPLE_RATE and bits == 16)
+                if chunk_size % 2:
+                    f.seek(1, 1)
+            elif chunk_id == b"data":
+                if not pcm_format_ok:
+                    return None
+                offset = f.tell()
+                # Streamed WAVs may carry a placeholder size; trust the file instead
+                data_size = min(chunk_size, file_size - offset)
+                return offset, data_size // BYTES_PER_SAMPLE
+            else:
+                f.seek(chunk_size + chunk_size % 2, 1)
+
+def open_pcm(path: Path):
+    """Memory-map the int16 samples of a pipeline WAV (see read_wav_header)"""
+    import numpy as np
+
+    header = read_wav_header(path)
+    if header is None:
+        raise ValueError(f"{path.name} is not a 16 kHz mono pcm_s16le WAV")
+    offset, n_samples = header
+    if n_samples == 0:
+        return np.zeros(0, dtype="<i2")
+    return np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(n_samples,))
+
+@contextmanager
+def decoded_pcm(audio_path: Path) -> Iterator:
+    """Decode any audio file to a temporary raw s16le file and memory-map it"""
+    import ffmpeg
+    import numpy as np
+
+    TMP_DIR.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="transcriptbot-", dir=TMP_DIR) as tmp_dir:
+        raw_path = Path(tmp_dir) / "audio.pcm"
+        (
+            ffmpeg
+            .input(str(audio_path))
+            .output(str(raw_path), format="s16le", acodec="pcm_s16le", ac=1, ar=str(SAMPLE_RATE))
+            .run(overwrite_output=True, quiet=True)
+        )
+        n_samples = raw_path.stat().st_size // BYTES_PER_SAMPLE
+        if n_samples == 0:
+            yield np.zeros(0, dtype="<i2")
+            return
+        yield np.memmap(raw_path, dtype="<i2", mode="r", shape=(n_samples,))
+
+def pcm_to_float(samples):
+    """Convert int16 samples to the float32 [-1, 1] range Whisper expects"""
+    import numpy as np
+
+    return samples.astype(np.float32) / 32768.0
+
+def _flac_duration(path: Path) -> Optional[float]:
+    """Read the duration from the FLAC STREAMINFO block"""
+    with path.open("rb") as f:
+        header = f.read(42)
+    if len(header) < 42 or header[:4] != b"fLaC" or header[4] & 0x7F != 0:
+        return None
+    packed = int.from_bytes(header[18:26], "big")
+    sample_rate = packed >> 44
+    total_samples = packed & ((1 << 36) - 1)
+    if not sample_rate or not total_samples:
+        return None
+    return total_samples / sample_rate
+
+def _ffprobe_duration(path: Path) -> Optional[float]:
+    """Ask ffprobe for the container duration (reads headers only)"""
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", str(path)],
+            capture_output=True, text=True, timeout=5,
+        )
+        return float(result.stdout.strip())
+    except (OSError, subprocess.TimeoutExpired, ValueError):
+        return None
+
+def media_duration(path: Path) -> Optional[float]:
+    """Return the duration of an audio/video file in seconds, or None if unknown"""
+    suffix = path.suffix.lower()
+    try:
+        if suffix == ".wav":
+            with wave.open(str(path), "rb") as wav:
+                return wav.getnframes() / wav.getframerate()
+        if suffix == ".flac":
+            duration = _flac_duration(path)
+            if duration is not None:
+                return duration
+    except (OSError, EOFError, wave.Error):
+        pass
+
+    if shutil.which("ffprobe") is None:
+        return None
+    return _ffprobe_duration(path)
+
+def split_window_result(segments: List[dict], window_seconds: float, final: bool) -> Tuple[List[dict], float]:
+    """Choose which segments of a window are final and where the next window starts
+
+    Segments ending within HOLDBACK_SECONDS of the window edge may be cut off
+    mid-word, so they are dropped and transcribed again with the next window.
+    """
+    if final:
+        return segments, window_seconds
+    commit = [s for s in segments if s["end"] <= window_seconds - HOLDBACK_SECONDS]
+    if not commit and segments:
+        # One long segment still has to move the window forward
+        commit = segments[:-1] or segments[:1]
+    cut = commit[-1]["end"] if commit else window_seconds - HOLDBACK_SECONDS
+    if not 0 < cut <= window_seconds:
+        cut = window_seconds - HOLDBACK_SECONDS
+    return commit, cut
+
+def transcribe_pcm(model, pcm, language: Optional[str] = None, use_vad: bool = VOICE_ACTIVITY_DETECTION,
+                   checkpoint=None) -> dict:
+    """Transcribe int16 samples window by window; returns a model.transcribe-style result
+
+    Like Whisper itself, the language is detected on the first window only.
+    The last segments of each window are passed on as prompt context.
+    With use_vad, only detected speech spans are transcribed and the result
+    additionally reports total_seconds and speech_seconds.
+    With a TranscriptionCheckpoint, progress is saved after windows and a
+    saved state is resumed with its language, speech spans and prompt context.
+    """
+    state = checkpoint.load() if checkpoint else None
+
+    speech = None
+    if use_vad:
+        from voice_activity import SpeechView, detect_speech
+
+        spans = [tuple(span) for span in state["spans"]] if state else detect_speech(pcm)
+        speech = SpeechView(pcm, spans)
+        total_seconds = len(pcm) / SAMPLE_RATE
+        pcm = speech
+
+    window_samples = WINDOW_SECONDS * SAMPLE_RATE
+    segments = []
+    start = 0
+    if state:
+        segments, start, language = state["segments"], state["position"], state["language"]
+
+    def save_checkpoint(force: bool = False):
+        checkpoint.save({
+            "position": start,
+            "position_seconds": start / SAMPLE_RATE,
+            "language": language,
+            "segments": segments,
+            "spans": speech.spans if speech is not None else None,
+        }, force=force)
+
+    try:
+        while start < len(pcm):
+            window = pcm[start:start + window_samples]
+            final = start + len(window) >= len(pcm)
+            window_seconds = len(window) / SAMPLE_RATE
+            context = " ".join(s["text"].strip() for s in segments[-5:]) or None
+
+            result = model.transcribe(pcm_to_float(window), language=language,
+                                      initial_prompt=context, verbose=None)
+            if language is None:
+                language = result.get("language")
+
+            commit, cut = split_window_result(result.get("segments", []), window_seconds, final)
+            offset = start / SAMPLE_RATE
+            for segment in commit:
+                segments.append({"start": offset + segment["start"], "end": offset + segment["end"],
+                                 "text": segment["text"]})
+            start += max(1, int(cut * SAMPLE_RATE))
+            if checkpoint:
+                save_checkpoint(force=final)
+    except KeyboardInterrupt:
+        # Keep everything committed so far; the next run continues from here
+        if checkpoint:
+            save_checkpoint(force=True)
+        raise
+
+    text = "".join(s["text"] for s in segments)
+    result = {"text": text, "segments": segments, "language": language}
+    if speech is not None:
+        for segment in segments:
+            segment["start"] = speech.to_original(segment["start"])
+            segment["end"] = speech.to_original(segment["end"], is_end=True)
+        result["total_seconds"] = total_seconds
+        result["speech_seconds"] = len(speech) / SAMPLE_RATE
+    return result
+
+def transcribe_audio(model, audio_path: Path, language: Optional[str] = None, resumable: bool = False) -> dict:
+    """Transcribe a file, memory-mapping pipeline WAVs instead of decoding them again
+
+    With resumable, progress is checkpointed (see transcription_checkpoint.py).
+    """
+    checkpoint = None
+    if resumable:
+        from transcription_checkpoint import TranscriptionCheckpoint
+
+        checkpoint = TranscriptionCheckpoint(audio_path, language, {
+            "vad": VOICE_ACTIVITY_DETECTION, "window": WINDOW_SECONDS, "holdback": HOLDBACK_SECONDS,
+        })
+    if read_wav_header(audio_path):
+        return transcribe_pcm(model, open_pcm(audio_path), language, checkpoint=checkpoint)
+    with decoded_pcm(audio_path) as pcm:
+        return transcribe_pcm(model, pcm, language, checkpoint=checkpoint)
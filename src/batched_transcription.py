@@ -0,0 +1,168 @@
+"""
+Batched Whisper inference for many short recordings
+Voice memos of a few minutes are dominated by the per-call overhead of
+model.transcribe and by single-window tensor ops. Here the 30 s mel windows
+of several files are stacked into one batch: the encoder runs once per
+batch, language detection reuses the encoder output, and all windows of
+the same language are decoded together. Results are split back per file
+with the language chosen per file (German/English only).
+
+Windows are decoded without prompt context and without overlap, because
+they are decoded at the same time. Files whose windows look like a failed
+decode (repetition loops) are returned as None so the caller can use the
+sequential model.transcribe path with its temperature fallback instead.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from audio_loader import SAMPLE_RATE, WINDOW_SECONDS, read_wav_header, open_pcm, decoded_pcm, pcm_to_float
+from constants import (
+    BATCH_WINDOWS, TRANSCRIPT_LANGUAGES, VOICE_ACTIVITY_DETECTION,
+    COMPRESSION_RATIO_THRESHOLD, NO_SPEECH_THRESHOLD, LOGPROB_THRESHOLD,
+)
+
+SECONDS_PER_TIMESTAMP = 0.02
+
+class FileWindows:
+    """30 s float windows of one recording plus what is needed to map times back"""
+
+    def __init__(self, audio_path: Path, pcm):
+        self.audio_path = audio_path
+        self.total_seconds = len(pcm) / SAMPLE_RATE
+        self.speech = None
+        if VOICE_ACTIVITY_DETECTION:
+            from voice_activity import SpeechView, detect_speech
+
+            self.speech = SpeechView(pcm, detect_speech(pcm))
+            pcm = self.speech
+        window_samples = WINDOW_SECONDS * SAMPLE_RATE
+        self.windows = [pcm_to_float(pcm[start:start + window_samples])
+                        for start in range(0, len(pcm), window_samples)]
+
+def load_windows(audio_path: Path) -> FileWindows:
+    """Read a short recording into memory as Whisper windows"""
+    if read_wav_header(audio_path):
+        return FileWindows(audio_path, open_pcm(audio_path))
+    with decoded_pcm(audio_path) as pcm:
+        return FileWindows(audio_path, pcm)
+
+def parse_segments(tokenizer, tokens: List[int], window_seconds: float) -> List[dict]:
+    """Turn decoded tokens with timestamp tokens into segments relative to the window"""
+    segments = []
+    start = 0.0
+    text_tokens = []
+    for token in tokens:
+        if token >= tokenizer.timestamp_begin:
+            seconds = min((token - tokenizer.timestamp_begin) * SECONDS_PER_TIMESTAMP, window_seconds)
+            if text_tokens:
+                segments.append({"start": start, "end": seconds, "text": tokenizer.decode(text_tokens)})
+                text_tokens = []
+            start = seconds
+        else:
+            text_tokens.append(token)
+    if text_tokens:
+        segments.append({"start": start, "end": window_seconds, "text": tokenizer.decode(text_tokens)})
+    return [s for s in segments if s["text"].strip()]
+
+def choose_language(window_probs: List[dict]) -> str:
+    """Average the per-window language probabilities and pick German or English"""
+    if not window_probs:
+        return TRANSCRIPT_LANGUAGES[0]
+    return max(TRANSCRIPT_LANGUAGES, key=lambda language: sum(p.get(language, 0.0) for p in window_probs))
+
+def _transcribe_group(model, files: List[FileWindows]) -> Dict[Path, Optional[dict]]:
+    """Encode, detect and decode the windows of a few files as one batch"""
+    import torch
+    import whisper
+    from whisper.tokenizer import get_tokenizer
+
+    owners = [(file_index, window_index)
+              for file_index, item in enumerate(files) for window_index in range(len(item.windows))]
+    window_probs: Dict[int, List[dict]] = {}
+    decoded = {}
+    if owners:
+        fp16 = model.device.type != "cpu"
+        mels = [whisper.log_mel_spectrogram(whisper.pad_or_trim(files[f].windows[w]), n_mels=model.dims.n_mels)
+                for f, w in owners]
+        with torch.no_grad():
+            features = model.embed_audio(torch.stack(mels).to(model.device, torch.float16 if fp16 else torch.float32))
+            probs = model.detect_language(features)[1] if model.is_multilingual else [{"en": 1.0}] * len(owners)
+            for (f, _), window_prob in zip(owners, probs):
+                window_probs.setdefault(f, []).append(window_prob)
+
+            # Decode all windows of one language together
+            for language in set(choose_language(p) for p in window_probs.values()):
+                indices = [i for i, (f, _) in enumerate(owners) if choose_language(window_probs[f]) == language]
+                options = whisper.DecodingOptions(task="transcribe", language=language, temperature=0.0,
+                                                  without_timestamps=False, fp16=fp16)
+                decoded.update(zip(indices, model.decode(features[indices], options)))
+
+    results = {}
+    for file_index, item in enumerate(files):
+        # Language per file from all of its windows
+        language = choose_language(window_probs.get(file_index, []))
+        tokenizer = get_tokenizer(model.is_multilingual, num_languages=model.num_languages,
+                                  language=language, task="transcribe")
+        segments, failed = [], False
+        for i, (f, w) in enumerate(owners):
+            if f != file_index:
+                continue
+            decoding = decoded[i]
+            if decoding.compression_ratio > COMPRESSION_RATIO_THRESHOLD:
+                failed = True
+                break
+            if decoding.no_speech_prob > NO_SPEECH_THRESHOLD and decoding.avg_logprob < LOGPROB_THRESHOLD:
+                continue
+            window_seconds = len(item.windows[w]) / SAMPLE_RATE
+            offset = w * WINDOW_SECONDS
+            for segment in parse_segments(tokenizer, decoding.tokens, window_seconds):
+                segments.append({"start": offset + segment["start"], "end": offset + segment["end"],
+                                 "text": segment["text"]})
+        if failed:
+            results[item.audio_path] = None
+            continue
+
+        result = {"text": "".join(s["text"] for s in segments), "segments": segments, "language": language}
+        if item.speech is not None:
+            for segment in segments:
+                segment["start"] = item.speech.to_original(segment["start"])
+                segment["end"] = item.speech.to_original(segment["end"], is_end=True)
+            result["total_seconds"] = item.total_seconds
+            result["speech_seconds"] = len(item.speech) / SAMPLE_RATE
+        results[item.audio_path] = result
+    return results
+
+def transcribe_many(model, audio_paths: List[Path]) -> Dict[Path, Optional[dict]]:
+    """Transcribe short recordings in batches of up to BATCH_WINDOWS windows
+
+    Returns a model.transcribe-style result per file, or None for files that
+    could not be loaded or need the sequential path.
+    """
+    results = {}
+    group, group_windows = [], 0
+
+    def flush():
+        nonlocal group, group_windows
+        if group:
+            print(f"📦 Transcribing {len(group)} recordings ({group_windows} windows) as one batch...")
+            try:
+                results.update(_transcribe_group(model, group))
+            except Exception as e:
+                print(f"⚠️  Batch failed ({e}) – transcribing its recordings one by one")
+                results.update({item.audio_path: None for item in group})
+        group, group_windows = [], 0
+
+    for audio_path in audio_paths:
+        try:
+            item = load_windows(audio_path)
+        except Exception as e:
+            print(f"⚠️  Could not load {audio_path.name} for batching: {e}")
+            results[audio_path] = None
+            continue
+        if group and group_windows + len(item.windows) > BATCH_WINDOWS:
+            flush()
+        group.append(item)
+        group_windows += len(item.windows)
+    flush()
+    return results
@@ -0,0 +1,125 @@
+"""
+Shared configuration and constants for TranscriptBot
+
+This module must stay import-cheap (standard library only), because the
+planning and search commands import it without loading Whisper or OpenAI.
+Model and budget settings can be overridden with TRANSCRIPTBOT_* environment
+variables, which also reach the stages started by run_pipeline.py.
+"""
+
+import os
+from pathlib import Path
+
+# Base directories
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = PROJECT_DIR / "data"
+AUDIO_DIR = DATA_DIR / "audio"
+VIDEO_DIR = DATA_DIR / "video"
+TRANSCRIPT_DIR = DATA_DIR / "transcripts"
+SUMMARY_DIR = DATA_DIR / "summaries"
+TODO_DIR = SUMMARY_DIR / "todos"
+SEGMENT_DIR = TRANSCRIPT_DIR / "segments"  # Whisper segments with timestamps, one JSON per transcript
+CHECKPOINT_DIR = TRANSCRIPT_DIR / "checkpoints"  # progress of interrupted transcriptions
+INDEX_DIR = DATA_DIR / "index"
+TMP_DIR = DATA_DIR / "tmp"  # scratch files (decoded PCM) - on disk, not in a tmpfs /tmp
+
+# External source directories
+OBS_DIR = Path.home() / "Videos" / "OBS"
+MUSIC_DIR = Path.home() / "Music"
+
+# Supported formats per stage
+AUDIO_EXTENSIONS = [".wav", ".m4a", ".mp3", ".mp4", ".flac", ".aac", ".opus"]
+MUSIC_EXTENSIONS = [".wav", ".mp3", ".m4a", ".flac", ".aac", ".ogg", ".wma"]
+VIDEO_EXTENSIONS = [".mp4", ".mov", ".mkv", ".avi", ".webm", ".flv"]
+
+# Intermediate audio written by extract_audio_from_videos.py: "wav", "flac" or "opus"
+# (always 16 kHz mono; WAV ~115 MB/h, FLAC ~60 MB/h, Opus ~11 MB/h)
+INTERMEDIATE_AUDIO_FORMAT = "wav"
+INTERMEDIATE_AUDIO_SUFFIXES = [".wav", ".flac", ".opus"]
+OPUS_BITRATE = "24k"
+
+# Retention of intermediates once a verified transcript exists (see retention.py)
+RETENTION_AUDIO = "compress"  # "keep", "compress" (to Opus) or "delete"
+RETENTION_VIDEO = "delete"    # "keep" or "delete" (only copies whose original is still in ~/Videos/OBS)
+RETENTION_MIN_AGE_DAYS = 7    # age of the transcript before intermediates are touched
+
+# Only German and English recordings exist
+TRANSCRIPT_LANGUAGES = ["de", "en"]
+
+# Whisper
+WHISPER_MODEL = "base"  # Alternative: "small", "medium", "large"
+# Same thresholds model.transcribe uses to reject a decode or treat a window as silence
+COMPRESSION_RATIO_THRESHOLD = 2.4
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+
+# Transcribe only detected speech spans (skips silence and breaks, see voice_activity.py)
+VOICE_ACTIVITY_DETECTION = True
+
+# Fingerprint new recordings and transcribe only one of several copies of the same meeting
+DEDUPLICATE_RECORDINGS = True
+
+# Save transcription progress at most this often (seconds) so an interrupted run can resume
+CHECKPOINT_INTERVAL_SECONDS = 60
+
+# Short recordings (voice memos) are transcribed together: their 30 s windows
+# share encoder and decoder batches instead of one model.transcribe call each
+BATCH_TRANSCRIPTION = True
+BATCH_MAX_FILE_SECONDS = 180  # longer files use the sequential, checkpointed path
+BATCH_WINDOWS = 16            # 30 s windows per encoder/decoder batch
+
+# Rough CPU processing time per second of audio, per Whisper model
+WHISPER_REALTIME_FACTOR = {
+    "tiny": 0.1,
+    "base": 0.2,
+    "small": 0.6,
+    "medium": 1.5,
+    "large": 3.0,
+}
+
+# OpenAI - strong model for long transcripts, cheaper/faster model for short ones
+OPENAI_MODEL = os.getenv("TRANSCRIPTBOT_MODEL", "gpt-4")
+OPENAI_FAST_MODEL = os.getenv("TRANSCRIPTBOT_FAST_MODEL", "gpt-4o-mini")
+FAST_MODEL_MAX_INPUT_TOKENS = 4000  # prompts up to this size go to OPENAI_FAST_MODEL (0 disables routing)
+# Prompts that don't fit the strong model's context window go to this model
+OPENAI_LONG_CONTEXT_MODEL = os.getenv("TRANSCRIPTBOT_LONG_CONTEXT_MODEL", "gpt-4o")
+MIN_TRANSCRIPT_CHARS = 100  # shorter transcripts are skipped by the summary and TODO stages
+
+# Budgets for the LLM stages (unset = unlimited). The run budget is shared by all
+# stages of one pipeline run via a ledger in RUN_LEDGER_DIR, keyed by TRANSCRIPTBOT_RUN_ID.
+RUN_BUDGET_USD = float(os.getenv("TRANSCRIPTBOT_RUN_BUDGET_USD", "0")) or None
+FILE_BUDGET_TOKENS = int(os.getenv("TRANSCRIPTBOT_FILE_BUDGET_TOKENS", "0")) or None
+RUN_ID_ENV = "TRANSCRIPTBOT_RUN_ID"
+RUN_LEDGER_DIR = INDEX_DIR / "runs"
+RUN_LEDGER_MAX_AGE_HOURS = 24  # ledgers of finished runs are removed when a new run starts
+
+# USD per 1K tokens (input, output)
+OPENAI_PRICING = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+# Context window (prompt + completion) per model
+MODEL_CONTEXT_TOKENS = {
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-3.5-turbo": 16385,
+}
+
+# Rough generation speed per model, for wall time estimates
+OUTPUT_TOKENS_PER_SECOND = {
+    "gpt-4": 20,
+    "gpt-4-turbo": 30,
+    "gpt-4o": 60,
+    "gpt-4o-mini": 80,
+    "gpt-3.5-turbo": 80,
+}
+
+# Estimation heuristics for audio that has not been transcribed yet
+SPOKEN_TOKENS_PER_MINUTE = 200  # ~150 words per minute of conversation
+CHARS_PER_TOKEN = 4
@@ -6,6 +6,8 @@ import shutil
 import filecmp
 from pathlib import Path
 
+from transcribe_batch import existing_transcript
+
 # Source and target directories
 source_dir = Path.home() / "Music"
 target_dir = Path(__file__).resolve().parent.parent / "data" / "audio"
@@ -21,6 +23,11 @@ for audio_file in source_dir.rglob("*"):  # rglob for recursive search
     if audio_file.is_file() and audio_file.suffix.lower() in audio_extensions:
         destination = target_dir / audio_file.name
         
+        # Copy was removed by the retention policy after transcription
+        if not destination.exists() and existing_transcript(audio_file):
+            print(f"⏭️  {audio_file.name} – Transcript already exists.")
+            continue
+        
         # Check if file already exists and is identical
         if destination.exists() and filecmp.cmp(audio_file, destination, shallow=False):
             print(f"⏭️  {audio_file.name} – Audio file already exists and is identical.")
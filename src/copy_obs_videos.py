@@ -1,6 +1,8 @@
 import shutil
 from pathlib import Path
 
+from transcribe_batch import existing_transcript
+
 # Eingabe- und Zielverzeichnis definieren
 source_dir = Path.home() / "Videos" / "OBS"
 target_dir = Path(__file__).resolve().parent.parent / "data" / "video"
@@ -15,7 +17,10 @@ video_extensions = [".mp4", ".mkv", ".mov", ".avi", ".webm", ".flv"]
 for video_file in source_dir.glob("*"):
     if video_file.suffix.lower() in video_extensions:
         destination = target_dir / video_file.name
-        if not destination.exists():
+        if not destination.exists() and existing_transcript(video_file):
+            # Copy was removed by the retention policy after transcription
+            print(f"⏭️  {video_file.name} – Transcript already exists.")
+        elif not destination.exists():
             print(f"🎬 Copying video from {video_file} ...")
             shutil.copy2(video_file, destination)
             print(f"✅ Saved video to {destination}")
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Create a digest over many meetings from their existing summaries
+Summaries are combined hierarchically along calendar buckets (ISO week,
+then month, then year, then everything); a bucket whose summaries don't
+fit the model's context window in one request is combined in several
+token-sized steps, and raw transcripts are never re-sent. Every intermediate
+node is cached by the hash of its inputs, and bucket boundaries don't
+depend on the other meetings, so adding a meeting - also one processed
+late - only recomputes its own week, month and year.
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import sys
+from datetime import datetime, date, timedelta
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from constants import SUMMARY_DIR, OPENAI_MODEL, OPENAI_LONG_CONTEXT_MODEL
+from summarize_transcripts import setup_openai_client, extract_date_from_filename
+from token_budget import TokenBudget, estimate_call
+
+DIGEST_DIR = SUMMARY_DIR / "digests"
+DIGEST_CACHE_DIR = DIGEST_DIR / "cache"
+
+DIGEST_MAX_TOKENS = 1500
+DIGEST_SYSTEM_PROMPT = "Du bist ein Experte für technische Dokumentation und Meeting-Zusammenfassungen."
+UNDATED = "undatiert"
+# Bump when the prompt changes so cached nodes are recomputed
+DIGEST_PROMPT_VERSION = 1
+
+class DigestNode:
+    """A meeting summary (leaf) or a combined digest of several nodes"""
+
+    def __init__(self, label: str, text: str, first: Optional[date], last: Optional[date],
+                 children=None, key: Optional[str] = None, buckets: Optional[Tuple[str, str, str]] = None):
+        self.label = label
+        self.text = text
+        self.first = first
+        self.last = last
+        self.children = children or []
+        # (week, month, year) bucket; combined nodes inherit it from their children
+        self.buckets = buckets or (self.children[0].buckets if self.children else bucket_keys(first))
+        # Leaves are keyed by content, combined nodes by the keys of their inputs
+        self.key = key or hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @property
+    def period(self) -> str:
+        if not self.first:
+            return "undatiert"
+        if self.first == self.last:
+            return self.first.strftime("%d.%m.%Y")
+        return f"{self.first.strftime('%d.%m.%Y')} – {self.last.strftime('%d.%m.%Y')}"
+
+def bucket_keys(meeting_date: Optional[date]) -> Tuple[str, str, str]:
+    """ISO week, month and year bucket of a meeting
+
+    A week belongs to the month and year of its Thursday (the ISO rule), so
+    every week lies in exactly one month and the buckets never shift.
+    """
+    if meeting_date is None:
+        return UNDATED, UNDATED, UNDATED
+    iso_year, week, weekday = meeting_date.isocalendar()
+    thursday = meeting_date + timedelta(days=4 - weekday)
+    return f"{iso_year}-W{week:02d}", f"{thursday.year}-{thursday.month:02d}", str(thursday.year)
+
+def summary_date(path: Path) -> Optional[date]:
+    """Meeting date of a summary, parsed via extract_date_from_filename"""
+    formatted = extract_date_from_filename(path.stem)
+    if not formatted:
+        return None
+    return datetime.strptime(formatted, "%d.%m.%Y").date()
+
+def select_summaries(pattern: Optional[str], since: Optional[date], until: Optional[date]) -> List[Path]:
+    """Pick summaries by filename pattern and/or date range, in chronological order"""
+    selected = []
+    for path in SUMMARY_DIR.glob("*.md"):
+        if path.name == "README.md":
+            continue
+        if pattern and not fnmatch.fnmatch(path.name.lower(), pattern.lower()):
+            continue
+        meeting_date = summary_date(path)
+        if (since or until) and meeting_date is None:
+            continue
+        if since and meeting_date < since:
+            continue
+        if until and meeting_date > until:
+            continue
+        selected.append(path)
+    return sorted(selected, key=lambda p: (summary_date(p) or date.min, p.name))
+
+def create_digest_prompt(nodes: List[DigestNode], use_german: bool) -> str:
+    """Create a prompt that merges several (partial) summaries into one"""
+    sections = "\n\n".join(f"=== {node.label} ({node.period}) ===\n{node.text}" for node in nodes)
+    if use_german:
+        return f"""
+Du erhältst mehrere Zusammenfassungen von Meetings bzw. bereits zusammengefasste Meeting-Gruppen.
+Erstelle daraus EINE konsolidierte Zusammenfassung in deutscher Sprache.
+
+ZUSAMMENFASSUNGEN:
+{sections}
+
+ANFORDERUNGEN:
+- Strukturiere mit Markdown (## ### und Emojis)
+- Fasse wiederkehrende Themen zusammen und zeige ihre Entwicklung über die Zeit
+- Behalte Entscheidungen, Deadlines und offene Punkte mit Datum bei
+- Lasse Details weg, die später überholt wurden
+- Keine Einleitung, direkt mit den Inhalten beginnen
+"""
+    return f"""
+You receive several meeting summaries or already combined groups of meetings.
+Merge them into ONE consolidated summary in English.
+
+SUMMARIES:
+{sections}
+
+REQUIREMENTS:
+- Structure with Markdown (## ### and emojis)
+- Merge recurring topics and show how they developed over time
+- Keep decisions, deadlines and open items together with their dates
+- Drop details that were superseded later
+- No introduction, start directly with the content
+"""
+
+def build_digest_messages(nodes: List[DigestNode], use_german: bool) -> List[dict]:
+    """Chat messages for combining nodes"""
+    return [
+        {"role": "system", "content": DIGEST_SYSTEM_PROMPT},
+        {"role": "user", "content": create_digest_prompt(nodes, use_german)}
+    ]
+
+def split_by_tokens(nodes: List[DigestNode], model: str, use_german: bool) -> List[List[DigestNode]]:
+    """Split nodes into consecutive groups whose combine request fits the model's context window"""
+    groups = [[]]
+    for node in nodes:
+        candidate = groups[-1] + [node]
+        estimate = estimate_call(build_digest_messages(candidate, use_german), DIGEST_MAX_TOKENS, model)
+        if groups[-1] and not estimate.fits_context:
+            groups.append([node])
+        else:
+            groups[-1] = candidate
+    return groups
+
+def combined_key(children: List[DigestNode], model: str, use_german: bool) -> str:
+    """Cache key of a combined node, derived from its inputs only"""
+    key = hashlib.sha256()
+    key.update(f"{DIGEST_PROMPT_VERSION}|{model}|{'de' if use_german else 'en'}".encode("utf-8"))
+    for child in children:
+        key.update(child.key.encode("ascii"))
+    return key.hexdigest()
+
+def combine(client, children: List[DigestNode], model: str, use_german: bool, stats: dict,
+            label: Optional[str] = None, budget: Optional[TokenBudget] = None) -> Optional[DigestNode]:
+    """Combine child nodes into one, using the cache when possible"""
+    first = min((c.first for c in children if c.first), default=None)
+    last = max((c.last for c in children if c.last), default=None)
+    label = label or (f"{len(children)} Gruppen" if use_german else f"{len(children)} groups")
+
+    key = combined_key(children, model, use_german)
+    cache_path = DIGEST_CACHE_DIR / f"{key[:32]}.md"
+    if cache_path.exists():
+        stats["cached"] += 1
+        return DigestNode(label, cache_path.read_text(encoding="utf-8"), first, last, children, key)
+
+    if client is None:  # dry run
+        stats["to_compute"] += 1
+        return DigestNode(label, "", first, last, children, key)
+
+    messages = build_digest_messages(children, use_german)
+    estimate = estimate_call(messages, DIGEST_MAX_TOKENS, model)
+    budget = budget or TokenBudget.for_run()
+    reason = budget.check(estimate)
+    if reason:
+        print(f"⛔ Not combining {len(children)} summaries - {reason}")
+        return None
+
+    print(f"🧩 Combining {len(children)} summaries ({children[0].period} … {children[-1].period}, "
+          f"{estimate.input_tokens} tokens)...")
+    try:
+        response = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=DIGEST_MAX_TOKENS,
+            temperature=0.3
+        )
+    except Exception as e:
+        print(f"❌ Error combining summaries: {e}")
+        return None
+    budget.record(estimate, getattr(response, "usage", None))
+
+    text = response.choices[0].message.content
+    DIGEST_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(text, encoding="utf-8")
+    stats["computed"] += 1
+    return DigestNode(label, text, first, last, children, key)
+
+def reduce_group(client, nodes: List[DigestNode], model: str, use_german: bool, stats: dict,
+                 label: Optional[str], budget: TokenBudget) -> Optional[DigestNode]:
+    """Combine the nodes of one bucket into one, in several steps if they don't fit one request"""
+    while len(nodes) > 1:
+        groups = split_by_tokens(nodes, model, use_german)
+        if len(groups) == len(nodes):
+            print(f"⛔ Summaries of {label or 'the digest'} are too long to combine even in pairs with {model} "
+                  f"- use --model with a larger context window (e.g. {OPENAI_LONG_CONTEXT_MODEL})")
+            return None
+        next_nodes = []
+        for group in groups:
+            node = group[0] if len(group) == 1 else combine(
+                client, group, model, use_german, stats, label if len(groups) == 1 else None, budget)
+            if node is None:
+                return None
+            next_nodes.append(node)
+        nodes = next_nodes
+    return nodes[0] if nodes else None
+
+def build_digest(client, summaries: List[Path], model: str, use_german: bool) -> Tuple[Optional[DigestNode], dict]:
+    """Reduce the selected summaries week by week, then by month, year and overall
+
+    Buckets depend only on each meeting's own date, so inserting a meeting
+    anywhere invalidates exactly one node per level.
+    """
+    stats = {"cached": 0, "computed": 0, "to_compute": 0}
+    budget = TokenBudget.for_run()
+    level = []
+    for path in summaries:
+        meeting_date = summary_date(path)
+        level.append(DigestNode(path.stem, path.read_text(encoding="utf-8"), meeting_date, meeting_date))
+
+    for depth in range(3):  # week, month, year
+        groups = {}
+        for node in level:
+            groups.setdefault(node.buckets[depth], []).append(node)
+        next_level = []
+        for bucket, group in groups.items():
+            node = reduce_group(client, group, model, use_german, stats, bucket, budget)
+            if node is None:
+                return None, stats
+            next_level.append(node)
+        level = next_level
+
+    if len(level) > 1:
+        return reduce_group(client, level, model, use_german, stats, None, budget), stats
+    return (level[0] if level else None), stats
+
+def digest_name(pattern: Optional[str], since: Optional[date], until: Optional[date]) -> str:
+    """Readable default filename for a digest selection"""
+    parts = ["digest"]
+    if pattern:
+        parts.append("".join(c if c.isalnum() or c in "-_" else "" for c in pattern) or "pattern")
+    if since:
+        parts.append(f"from_{since.isoformat()}")
+    if until:
+        parts.append(f"to_{until.isoformat()}")
+    return "_".join(parts) + ".md"
+
+def _parse_date(value: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Create a multi-meeting digest from cached per-meeting summaries"""
+    parser = argparse.ArgumentParser(description="Combine existing meeting summaries into one digest")
+    parser.add_argument("--pattern", help="filename pattern, e.g. '*thesis-coaching*'")
+    parser.add_argument("--since", type=_parse_date, help="first meeting date (YYYY-MM-DD)")
+    parser.add_argument("--until", type=_parse_date, help="last meeting date (YYYY-MM-DD)")
+    parser.add_argument("--language", choices=["de", "en"], default="de", help="digest language (default: de)")
+    parser.add_argument("--model", default=OPENAI_MODEL, help=f"OpenAI model (default: {OPENAI_MODEL})")
+    parser.add_argument("--output", type=Path, help="output file (default: data/summaries/digests/<selection>.md)")
+    parser.add_argument("--dry-run", action="store_true", help="show selection and cache hits without calling OpenAI")
+    args = parser.parse_args(argv)
+
+    print("📚 Creating multi-meeting digest...")
+    summaries = select_summaries(args.pattern, args.since, args.until)
+    if not summaries:
+        print("❌ No summaries match the selection!")
+        return 1
+
+    print(f"📄 Selected {len(summaries)} summaries")
+    for path in summaries:
+        print(f"   • {path.name}")
+
+    use_german = args.language == "de"
+    client = None
+    if not args.dry_run and len(summaries) > 1:
+        client = setup_openai_client()
+        if not client:
+            return 1
+
+    root, stats = build_digest(client, summaries, args.model, use_german)
+    if args.dry_run:
+        print(f"🧭 {stats['cached']} cached nodes, {stats['to_compute']} to compute")
+        return 0
+    if root is None:
+        return 1
+
+    title = "Zusammenfassung mehrerer Meetings" if use_german else "Multi-meeting digest"
+    header = f"# 📚 {title} ({root.period})\n\n"
+    sources = "\n".join(f"- {path.name}" for path in summaries)
+    footer = f"\n\n---\n{'Quellen' if use_german else 'Sources'}:\n{sources}\n"
+
+    output_path = args.output or DIGEST_DIR / digest_name(args.pattern, args.since, args.until)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(header + root.text + footer, encoding="utf-8")
+
+    print(f"♻️  Reused {stats['cached']} cached nodes, computed {stats['computed']} new ones")
+    print(f"💾 Digest saved to {output_path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,36 +1,75 @@
-import ffmpeg
+import argparse
 from pathlib import Path
+from typing import Optional
 
-# Base directory relative to src/
-DATA_DIR = Path(__file__).resolve().parent.parent / "data"
-VIDEO_DIR = DATA_DIR / "video"
-AUDIO_DIR = DATA_DIR / "audio"
-
-# Create output directory if it doesn't exist
-AUDIO_DIR.mkdir(parents=True, exist_ok=True)
-
-# Supported video extensions
-VIDEO_EXTENSIONS = [".mp4", ".mov", ".mkv", ".avi", ".webm", ".flv"]
-
-# Process all videos
-for video_path in VIDEO_DIR.iterdir():
-    if video_path.suffix.lower() not in VIDEO_EXTENSIONS:
-        continue
-
-    audio_path = AUDIO_DIR / (video_path.stem + ".wav")  # WAV statt MP3
-
-    if audio_path.exists():
-        print(f"⏭️  {video_path.name} – Audio already exists.")
-        continue
-
-    print(f"🎞️  Extracting audio from {video_path.name} ...")
-    try:
-        (
-            ffmpeg
-            .input(str(video_path))
-            .output(str(audio_path), format='wav', acodec='pcm_s16le', ac=1, ar='16000')
-            .run(overwrite_output=True, quiet=True)
-        )
-        print(f"✅ Saved audio to {audio_path}")
-    except ffmpeg.Error as e:
-        print(f"❌ Error processing {video_path.name}: {e}")
+from constants import (
+    VIDEO_DIR, AUDIO_DIR, VIDEO_EXTENSIONS,
+    INTERMEDIATE_AUDIO_FORMAT, INTERMEDIATE_AUDIO_SUFFIXES, OPUS_BITRATE,
+)
+from transcribe_batch import existing_transcript
+
+# ffmpeg output options per intermediate format - always 16 kHz mono, which is what Whisper uses
+AUDIO_FORMATS = {
+    "wav": {"suffix": ".wav", "format": "wav", "acodec": "pcm_s16le"},
+    "flac": {"suffix": ".flac", "format": "flac", "acodec": "flac"},
+    "opus": {"suffix": ".opus", "format": "opus", "acodec": "libopus", "audio_bitrate": OPUS_BITRATE},
+}
+
+def extracted_audio_for(video_path: Path) -> Optional[Path]:
+    """Return the intermediate audio of a video in any supported format, if it exists"""
+    for suffix in INTERMEDIATE_AUDIO_SUFFIXES:
+        audio_path = AUDIO_DIR / (video_path.stem + suffix)
+        if audio_path.exists():
+            return audio_path
+    return None
+
+def encode_audio(input_path: Path, output_path: Path, audio_format: str):
+    """Decode input_path and write 16 kHz mono audio in the given intermediate format"""
+    import ffmpeg
+
+    options = {key: value for key, value in AUDIO_FORMATS[audio_format].items() if key != "suffix"}
+    (
+        ffmpeg
+        .input(str(input_path))
+        .output(str(output_path), ac=1, ar='16000', **options)
+        .run(overwrite_output=True, quiet=True)
+    )
+
+def main(argv=None):
+    """Extract audio from all videos that have neither audio nor a transcript yet"""
+    import ffmpeg
+
+    parser = argparse.ArgumentParser(description="Extract 16 kHz mono audio from videos")
+    parser.add_argument("--format", choices=sorted(AUDIO_FORMATS), default=INTERMEDIATE_AUDIO_FORMAT,
+                        help=f"intermediate audio format (default: {INTERMEDIATE_AUDIO_FORMAT})")
+    args = parser.parse_args(argv)
+
+    # Create output directory if it doesn't exist
+    AUDIO_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Process all videos
+    for video_path in VIDEO_DIR.iterdir():
+        if video_path.suffix.lower() not in VIDEO_EXTENSIONS:
+            continue
+
+        existing_audio = extracted_audio_for(video_path)
+        if existing_audio:
+            print(f"⏭️  {video_path.name} – Audio already exists.")
+            continue
+
+        # Intermediates may have been removed by the retention policy
+        if existing_transcript(video_path):
+            print(f"⏭️  {video_path.name} – Transcript already exists.")
+            continue
+
+        audio_path = AUDIO_DIR / (video_path.stem + AUDIO_FORMATS[args.format]["suffix"])
+
+        print(f"🎞️  Extracting audio from {video_path.name} ...")
+        try:
+            encode_audio(video_path, audio_path, args.format)
+            print(f"✅ Saved audio to {audio_path}")
+        except ffmpeg.Error as e:
+            print(f"❌ Error processing {video_path.name}: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,16 @@ This script specifically focuses on creating actionable task lists
 
 import os
 import json
+import argparse
 from pathlib import Path
 from datetime import datetime
-import openai
-from typing import Optional, List
+from typing import Optional, List, Dict, TYPE_CHECKING
+
+from search_index import update_index
+from token_budget import TokenBudget, estimate_call, print_estimate_report, too_short_for_llm
+
+if TYPE_CHECKING:
+    import openai
 
 # Base directories
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
@@ -19,6 +25,9 @@ TODO_DIR = DATA_DIR / "summaries" / "todos"
 # Ensure TODO directory exists
 TODO_DIR.mkdir(parents=True, exist_ok=True)
 
+TODO_MAX_TOKENS = 1500
+TODO_SYSTEM_PROMPT = "Du bist ein Projektmanagement-Experte, der aus Meetings konkrete, actionable TODO-Listen erstellt."
+
 def setup_openai_client():
     """Setup OpenAI client with API key from environment variable"""
     api_key = os.getenv('OPENAI_API_KEY')
@@ -27,6 +36,7 @@ def setup_openai_client():
         print("Set it with: export OPENAI_API_KEY='your-api-key-here'")
         return None
     
+    import openai  # imported lazily so planning never loads the SDK
     return openai.OpenAI(api_key=api_key)
 
 def create_todo_prompt(transcript_text: str, filename: str) -> str:
@@ -170,7 +180,15 @@ OUTPUT FORMAT (Markdown):
 Create an actionable, prioritized TODO list from the transcript:
 """
 
-def extract_todos(client: openai.OpenAI, transcript_path: Path) -> Optional[str]:
+def build_todo_messages(transcript_text: str, filename: str) -> List[Dict[str, str]]:
+    """Chat messages for extracting TODOs from a transcript"""
+    return [
+        {"role": "system", "content": TODO_SYSTEM_PROMPT},
+        {"role": "user", "content": create_todo_prompt(transcript_text, filename)}
+    ]
+
+def extract_todos(client: "openai.OpenAI", transcript_path: Path,
+                  budget: Optional[TokenBudget] = None, model: Optional[str] = None) -> Optional[str]:
     """Extract TODOs from a single transcript using OpenAI"""
     
     try:
@@ -178,25 +196,29 @@ def extract_todos(client: openai.OpenAI, transcript_path: Path) -> Optional[str]
         transcript_text = transcript_path.read_text(encoding='utf-8')
         
         # Skip if transcript is too short
-        if len(transcript_text.strip()) < 100:
+        if too_short_for_llm(transcript_text):
             print(f"⏭️  Skipping {transcript_path.name} - too short")
             return None
         
-        print(f"📋 Extracting TODOs from {transcript_path.name}...")
+        # Create prompt and check it against the budget before sending anything
+        messages = build_todo_messages(transcript_text, transcript_path.name)
+        estimate = estimate_call(messages, TODO_MAX_TOKENS, model)
+        budget = budget or TokenBudget.for_run()
+        reason = budget.check(estimate)
+        if reason:
+            print(f"⛔ Skipping {transcript_path.name} - {reason}")
+            return None
         
-        # Create prompt
-        prompt = create_todo_prompt(transcript_text, transcript_path.name)
+        print(f"📋 Extracting TODOs from {transcript_path.name} with {estimate.model} ({estimate.input_tokens} tokens)...")
         
         # Call OpenAI API
         response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "Du bist ein Projektmanagement-Experte, der aus Meetings konkrete, actionable TODO-Listen erstellt."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1500,
+            model=estimate.model,
+            messages=messages,
+            max_tokens=TODO_MAX_TOKENS,
             temperature=0.2
         )
+        budget.record(estimate, getattr(response, "usage", None))
         
         todos = response.choices[0].message.content
         print(f"✅ TODOs extracted from {transcript_path.name}")
@@ -206,12 +228,15 @@ def extract_todos(client: openai.OpenAI, transcript_path: Path) -> Optional[str]
         print(f"❌ Error extracting TODOs from {transcript_path.name}: {e}")
         return None
 
+def todo_path_for(transcript_path: Path) -> Path:
+    """Return the TODO list path that belongs to a transcript"""
+    return TODO_DIR / f"{transcript_path.stem}_TODOs.md"
+
 def save_todos(todos: str, transcript_path: Path) -> Path:
     """Save TODOs to the appropriate directory"""
     
-    # Create filename
-    todo_filename = f"{transcript_path.stem}_TODOs.md"
-    todo_path = TODO_DIR / todo_filename
+    todo_path = todo_path_for(transcript_path)
+    todo_filename = todo_path.name
     
     # Check if TODO file already exists
     if todo_path.exists():
@@ -220,21 +245,35 @@ def save_todos(todos: str, transcript_path: Path) -> Path:
     # Save TODOs
     todo_path.write_text(todos, encoding='utf-8')
     print(f"💾 TODOs saved to {todo_path}")
+    update_index([todo_path])
     
     return todo_path
 
-def main():
+def estimate_todos(transcript_files: List[Path], model: Optional[str] = None) -> List[tuple]:
+    """[(name, CallEstimate)] for all transcripts TODOs would be extracted from"""
+    rows = []
+    for transcript_path in transcript_files:
+        transcript_text = transcript_path.read_text(encoding='utf-8')
+        if too_short_for_llm(transcript_text):
+            continue
+        messages = build_todo_messages(transcript_text, transcript_path.name)
+        rows.append((transcript_path.name, estimate_call(messages, TODO_MAX_TOKENS, model)))
+    return rows
+
+def main(argv=None):
     """Main function to process all transcripts for TODO extraction"""
     
-    print("📋 Starting TODO extraction from transcripts...")
+    parser = argparse.ArgumentParser(description="Extract TODO lists from transcripts with OpenAI")
+    parser.add_argument("--estimate", action="store_true", help="only report estimated tokens, cost and time")
+    parser.add_argument("--model", help="use this model for all transcripts (disables routing)")
+    parser.add_argument("--budget-usd", type=float, help="maximum spend for this run")
+    parser.add_argument("--max-file-tokens", type=int, help="maximum tokens (input + output) per transcript")
+    args = parser.parse_args(argv)
     
-    # Setup OpenAI client
-    client = setup_openai_client()
-    if not client:
-        return
+    print("📋 Starting TODO extraction from transcripts...")
     
-    # Find all transcripts
-    transcript_files = list(TRANSCRIPT_DIR.glob("*.txt"))
+    # Find all transcripts without a TODO list
+    transcript_files = sorted(TRANSCRIPT_DIR.glob("*.txt"))
     
     if not transcript_files:
         print("❌ No transcript files found!")
@@ -242,20 +281,36 @@ def main():
     
     print(f"📄 Found {len(transcript_files)} transcript files")
     
-    # Process each transcript
-    success_count = 0
-    for transcript_path in sorted(transcript_files):
-        
+    pending = []
+    for transcript_path in transcript_files:
         # Check if TODO file already exists
-        todo_filename = f"{transcript_path.stem}_TODOs.md"
-        todo_path = TODO_DIR / todo_filename
-        
-        if todo_path.exists():
+        if todo_path_for(transcript_path).exists():
             print(f"⏭️  TODOs for {transcript_path.name} already exist")
-            continue
+        else:
+            pending.append(transcript_path)
+    
+    budget = TokenBudget.for_run()
+    if args.budget_usd is not None:
+        budget.run_budget_usd = args.budget_usd
+    if args.max_file_tokens is not None:
+        budget.file_budget_tokens = args.max_file_tokens
+    
+    if pending:
+        print_estimate_report(estimate_todos(pending, args.model), budget)
+    if args.estimate or not pending:
+        return
+    
+    # Setup OpenAI client
+    client = setup_openai_client()
+    if not client:
+        return
+    
+    # Process each transcript
+    success_count = 0
+    for transcript_path in pending:
         
         # Extract TODOs
-        todos = extract_todos(client, transcript_path)
+        todos = extract_todos(client, transcript_path, budget, args.model)
         
         if todos:
             save_todos(todos, transcript_path)
@@ -263,7 +318,7 @@ def main():
         
         print()  # Empty line for readability
     
-    print(f"🎉 Finished! Created {success_count} new TODO lists")
+    print(f"🎉 Finished! Created {success_count} new TODO lists ({budget.summary()})")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Live transcription of an OBS recording while it is still being written
+ffmpeg follows the growing file and decodes newly appended audio to
+16 kHz mono PCM. Whisper transcribes it in rolling windows and segments
+are appended to the transcript as soon as they are final. When the
+recording stops, the transcript (and optionally the summary) is ready
+right away.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from audio_loader import SAMPLE_RATE, BYTES_PER_SAMPLE, WINDOW_SECONDS, pcm_to_float, split_window_result
+from constants import (
+    OBS_DIR, TRANSCRIPT_DIR, VIDEO_EXTENSIONS, TRANSCRIPT_LANGUAGES, NO_SPEECH_THRESHOLD, LOGPROB_THRESHOLD,
+)
+from voice_activity import detect_speech
+from transcribe_batch import load_model, existing_transcript, save_transcript
+
+READ_CHUNK_BYTES = SAMPLE_RATE * BYTES_PER_SAMPLE  # one second of audio
+
+# Recording is considered finished when the file stops growing this long
+IDLE_TIMEOUT_SECONDS = 30
+# A file modified within this time counts as an active recording
+ACTIVE_RECORDING_SECONDS = 60
+
+def find_active_recording(source_dir: Path = OBS_DIR) -> Optional[Path]:
+    """Return the most recently modified video in source_dir if it is still being written"""
+    if not source_dir.exists():
+        return None
+    videos = [p for p in source_dir.iterdir() if p.suffix.lower() in VIDEO_EXTENSIONS]
+    if not videos:
+        return None
+    newest = max(videos, key=lambda p: p.stat().st_mtime)
+    if time.time() - newest.stat().st_mtime > ACTIVE_RECORDING_SECONDS:
+        return None
+    return newest
+
+def follow_pcm(path: Path, idle_timeout: float = IDLE_TIMEOUT_SECONDS) -> Iterator[bytes]:
+    """Yield 16 kHz mono s16le PCM from a file that may still be growing
+
+    ffmpeg's file protocol keeps reading at EOF ('follow') and gives up
+    once no new data arrived for idle_timeout seconds.
+    """
+    import ffmpeg
+
+    process = (
+        ffmpeg
+        .input(f"file:{path}", follow=1, rw_timeout=int(idle_timeout * 1_000_000))
+        .output("pipe:", format="s16le", acodec="pcm_s16le", ac=1, ar=str(SAMPLE_RATE))
+        .run_async(pipe_stdout=True, quiet=True)
+    )
+    try:
+        while True:
+            chunk = process.stdout.read(READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        process.stdout.close()
+        process.wait()
+
+class LiveTranscriber:
+    """Transcribes a PCM stream in rolling windows and appends final segments to disk"""
+
+    def __init__(self, model, stem: str, language: Optional[str] = None):
+        self.model = model
+        self.stem = stem
+        self.language = language  # detected from the first window with speech unless given
+        self.segments: List[dict] = []
+        self.buffer = bytearray()       # PCM not yet committed
+        self.buffer_offset = 0.0        # position of buffer start in the recording (seconds)
+        self.part_path: Optional[Path] = None
+
+    @property
+    def buffered_seconds(self) -> float:
+        return len(self.buffer) / (SAMPLE_RATE * BYTES_PER_SAMPLE)
+
+    def feed(self, pcm: bytes):
+        """Add decoded audio; transcribes whenever a full window is buffered"""
+        self.buffer.extend(pcm)
+        while self.buffered_seconds >= WINDOW_SECONDS:
+            self._transcribe_window(final=False)
+
+    def finish(self) -> Optional[Path]:
+        """Transcribe the remaining audio and turn the partial transcript into the final one"""
+        if self.buffered_seconds > 0.5:
+            self._transcribe_window(final=True)
+
+        if self.part_path is None:
+            print("❌ No speech transcribed")
+            return None
+
+        # Written atomically like the batch transcriber, so a crash can't leave a partial transcript
+        result = {"text": self.part_path.read_text(encoding="utf-8"), "segments": self.segments}
+        transcript_path = save_transcript(Path(self.stem), result, self.language)
+        if transcript_path is None:
+            print(f"⚠️  Keeping {self.part_path.name} for inspection")
+            return None
+        self.part_path.unlink()
+        return transcript_path
+
+    def _window_pcm(self, seconds: float):
+        import numpy as np
+
+        n_bytes = int(seconds * SAMPLE_RATE) * BYTES_PER_SAMPLE
+        return np.frombuffer(bytes(self.buffer[:n_bytes]), dtype=np.int16)
+
+    def _detect_language(self, audio) -> str:
+        """Pick German or English by the detector's probabilities (like the batched transcriber)"""
+        import whisper
+        from batched_transcription import choose_language
+
+        if not self.model.is_multilingual:
+            return "en"
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=self.model.dims.n_mels)
+        _, probs = self.model.detect_language(mel.to(self.model.device))
+        return choose_language([probs])
+
+    def _transcribe_window(self, final: bool):
+        window_seconds = min(self.buffered_seconds, WINDOW_SECONDS)
+        pcm = self._window_pcm(window_seconds)
+
+        if self.language is None:
+            # Recordings often start with silence or setup noise - detect on the first window with speech
+            if not detect_speech(pcm):
+                _, cut = split_window_result([], window_seconds, final)
+                self._advance(cut)
+                return
+            self.language = self._detect_language(pcm_to_float(pcm))
+            print(f"🌍 Language: {self.language}")
+
+        context = " ".join(s["text"].strip() for s in self.segments[-5:]) or None
+        result = self.model.transcribe(pcm_to_float(pcm), language=self.language,
+                                       initial_prompt=context, verbose=None)
+        commit, cut = split_window_result(result.get("segments", []), window_seconds, final)
+        self._commit(commit)
+        self._advance(cut)
+
+    def _advance(self, cut: float):
+        """Drop the first cut seconds from the buffer"""
+        cut_bytes = int(cut * SAMPLE_RATE) * BYTES_PER_SAMPLE
+        del self.buffer[:cut_bytes]
+        self.buffer_offset += cut_bytes / (SAMPLE_RATE * BYTES_PER_SAMPLE)
+
+    def _commit(self, segments: List[dict]):
+        """Append final segments to the partial transcript on disk"""
+        lines = []
+        for segment in segments:
+            if (segment.get("no_speech_prob", 0) > NO_SPEECH_THRESHOLD
+                    and segment.get("avg_logprob", 0) < LOGPROB_THRESHOLD):
+                continue
+            text = segment["text"].strip()
+            if not text:
+                continue
+            self.segments.append({
+                "start": self.buffer_offset + segment["start"],
+                "end": self.buffer_offset + segment["end"],
+                "text": segment["text"],
+            })
+            lines.append(text)
+
+        if not lines:
+            return
+        if self.part_path is None:
+            TRANSCRIPT_DIR.mkdir(parents=True, exist_ok=True)
+            self.part_path = TRANSCRIPT_DIR / f"{self.stem}_{self.language}.txt.part"
+            self.part_path.write_text("", encoding="utf-8")
+        with self.part_path.open("a", encoding="utf-8") as f:
+            f.write(" ".join(lines) + " ")
+            f.flush()
+            os.fsync(f.fileno())
+        print(f"📝 [{self.segments[-1]['end'] / 60:5.1f} min] {' '.join(lines)[:100]}")
+
+def summarize_now(transcript_path: Path):
+    """Create summary and TODOs immediately instead of waiting for the next pipeline run"""
+    from summarize_transcripts import setup_openai_client, summarize_transcript, save_summary
+    from extract_todos import extract_todos, save_todos
+    from token_budget import TokenBudget
+
+    client = setup_openai_client()
+    if not client:
+        return
+    # Both calls count against one run budget
+    budget = TokenBudget.for_run()
+    summary = summarize_transcript(client, transcript_path, budget)
+    if summary:
+        save_summary(summary, transcript_path)
+    todos = extract_todos(client, transcript_path, budget)
+    if todos:
+        save_todos(todos, transcript_path)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Transcribe an in-progress recording"""
+    parser = argparse.ArgumentParser(description="Transcribe an OBS recording while it is being recorded")
+    parser.add_argument("recording", nargs="?", type=Path,
+                        help="file to follow (default: active recording in ~/Videos/OBS)")
+    parser.add_argument("--wait", action="store_true", help="wait for a recording to start")
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT_SECONDS,
+                        help=f"seconds without growth that end the recording (default: {IDLE_TIMEOUT_SECONDS})")
+    parser.add_argument("--summarize", action="store_true", help="create summary and TODOs when finished")
+    parser.add_argument("--language", choices=TRANSCRIPT_LANGUAGES,
+                        help="transcript language (default: detected from the first speech)")
+    args = parser.parse_args(argv)
+
+    recording = args.recording or find_active_recording()
+    while recording is None and args.wait:
+        time.sleep(5)
+        recording = find_active_recording()
+    if recording is None:
+        print(f"⏭️  No active recording in {OBS_DIR}")
+        return 1
+
+    if existing_transcript(recording):
+        print(f"⏭️  {recording.name} – transcript already exists.")
+        return 0
+
+    print(f"🔴 Following {recording.name} ...")
+    transcriber = LiveTranscriber(load_model(), recording.stem, language=args.language)
+    try:
+        for chunk in follow_pcm(recording, args.idle_timeout):
+            transcriber.feed(chunk)
+    except KeyboardInterrupt:
+        print("\n⏹️  Stopped - finishing transcript with the audio received so far")
+
+    transcript_path = transcriber.finish()
+    if transcript_path is None:
+        return 1
+    if args.summarize:
+        summarize_now(transcript_path)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
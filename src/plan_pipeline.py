@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Dry-run planner for the TranscriptBot pipeline
+Lists what every stage would process or skip, the total media duration
+and the estimated compute time and OpenAI token cost - without importing
+torch, whisper or openai, so it answers within about a second.
+"""
+
+import argparse
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from constants import (
+    AUDIO_DIR, VIDEO_DIR, TRANSCRIPT_DIR, OBS_DIR, MUSIC_DIR,
+    AUDIO_EXTENSIONS, MUSIC_EXTENSIONS, VIDEO_EXTENSIONS,
+    INTERMEDIATE_AUDIO_FORMAT, WHISPER_MODEL, WHISPER_REALTIME_FACTOR, OPENAI_MODEL,
+    SPOKEN_TOKENS_PER_MINUTE,
+)
+from audio_loader import media_duration
+from transcribe_batch import find_audio_files, existing_transcript
+from extract_audio_from_videos import AUDIO_FORMATS, extracted_audio_for
+from summarize_transcripts import summary_path_for, build_summary_messages, SUMMARY_MAX_TOKENS
+from extract_todos import todo_path_for, build_todo_messages, TODO_MAX_TOKENS
+from token_budget import (
+    CallEstimate, count_message_tokens, estimate_call, route_model, routing_rule, too_short_for_llm,
+)
+
+def durations_for(paths: List[Path]) -> Dict[Path, Optional[float]]:
+    """Probe many files in parallel"""
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return dict(zip(paths, executor.map(media_duration, paths)))
+
+def plan_copy_obs() -> Dict[str, List[Path]]:
+    """Mirror the selection logic of copy_obs_videos.py"""
+    plan = {"process": [], "skip": []}
+    if not OBS_DIR.exists():
+        return plan
+    for video_file in sorted(OBS_DIR.glob("*")):
+        if video_file.suffix.lower() in VIDEO_EXTENSIONS:
+            done = (VIDEO_DIR / video_file.name).exists() or existing_transcript(video_file)
+            plan["skip" if done else "process"].append(video_file)
+    return plan
+
+def plan_copy_music() -> Dict[str, List[Path]]:
+    """Mirror the selection logic of copy_music_files.py
+
+    Identical files are detected by size only; a full byte comparison
+    would defeat the purpose of a fast plan.
+    """
+    plan = {"process": [], "skip": []}
+    if not MUSIC_DIR.exists():
+        return plan
+    for audio_file in sorted(MUSIC_DIR.rglob("*")):
+        if not audio_file.is_file() or audio_file.suffix.lower() not in MUSIC_EXTENSIONS:
+            continue
+        size = audio_file.stat().st_size
+        candidates = [AUDIO_DIR / audio_file.name]
+        candidates += AUDIO_DIR.glob(f"{audio_file.stem}_*{audio_file.suffix}")
+        already_copied = any(c.exists() and c.stat().st_size == size for c in candidates)
+        done = already_copied or existing_transcript(audio_file)
+        plan["skip" if done else "process"].append(audio_file)
+    return plan
+
+def plan_extract(incoming_videos: List[Path]) -> Dict[str, List[Path]]:
+    """Mirror the selection logic of extract_audio_from_videos.py"""
+    plan = {"process": [], "skip": []}
+    videos = list(VIDEO_DIR.iterdir()) if VIDEO_DIR.exists() else []
+    videos += [VIDEO_DIR / v.name for v in incoming_videos]
+    for video_path in sorted(set(videos)):
+        if video_path.suffix.lower() not in VIDEO_EXTENSIONS:
+            continue
+        done = extracted_audio_for(video_path) or existing_transcript(video_path)
+        plan["skip" if done else "process"].append(video_path)
+    return plan
+
+def plan_transcribe(incoming_audio: List[Path]) -> Dict[str, List[Path]]:
+    """Mirror the selection logic of transcribe_batch.py"""
+    plan = {"process": [], "skip": []}
+    audio_files = find_audio_files() if AUDIO_DIR.exists() else []
+    audio_files += incoming_audio
+    for audio_path in sorted(set(audio_files)):
+        if audio_path.suffix.lower() not in AUDIO_EXTENSIONS:
+            continue
+        plan["skip" if existing_transcript(audio_path) else "process"].append(audio_path)
+    return plan
+
+def plan_llm_stage(output_path_for) -> Dict[str, List[Path]]:
+    """Select existing transcripts without output for summarize/TODO stages
+
+    Transcripts the stages skip as too short never get output, so they are
+    listed as skipped rather than keeping work pending forever.
+    """
+    plan = {"process": [], "skip": []}
+    transcripts = sorted(TRANSCRIPT_DIR.glob("*.txt")) if TRANSCRIPT_DIR.exists() else []
+    for transcript_path in transcripts:
+        done = output_path_for(transcript_path).exists()
+        done = done or too_short_for_llm(transcript_path.read_text(encoding="utf-8"))
+        plan["skip" if done else "process"].append(transcript_path)
+    return plan
+
+def estimate_tokens(transcripts: List[Path], pending_audio_seconds: List[float],
+                    build_messages, max_tokens: int) -> Dict[str, object]:
+    """Estimate tokens, cost and time for an LLM stage, routing each call like the stage does
+
+    Existing transcripts are counted exactly; audio that is not transcribed
+    yet is estimated from its duration plus the counted prompt overhead.
+    """
+    estimates = []
+    for transcript_path in transcripts:
+        text = transcript_path.read_text(encoding="utf-8")
+        if too_short_for_llm(text):  # skipped as too short by the stage itself
+            continue
+        estimates.append(estimate_call(build_messages(text, transcript_path.name), max_tokens))
+    prompt_tokens = count_message_tokens(build_messages("", "pending.txt"))
+    for seconds in pending_audio_seconds:
+        input_tokens = prompt_tokens + int(seconds / 60 * SPOKEN_TOKENS_PER_MINUTE)
+        estimates.append(CallEstimate(route_model(input_tokens, max_tokens), input_tokens, max_tokens))
+
+    models: Dict[str, int] = {}
+    for estimate in estimates:
+        models[estimate.model] = models.get(estimate.model, 0) + 1
+    costs = [estimate.cost for estimate in estimates]
+    return {
+        "calls": len(estimates),
+        "input_tokens": sum(estimate.input_tokens for estimate in estimates),
+        "output_tokens": sum(estimate.max_output_tokens for estimate in estimates),
+        "models": models,
+        "too_long": sum(1 for estimate in estimates if not estimate.fits_context),
+        "cost_usd": None if None in costs else round(sum(costs), 4),
+        "seconds": round(sum(estimate.seconds for estimate in estimates), 1),
+    }
+
+def build_plan() -> dict:
+    """Compute the full pipeline plan"""
+    copy_obs = plan_copy_obs()
+    copy_music = plan_copy_music()
+    extract = plan_extract(copy_obs["process"])
+    audio_suffix = AUDIO_FORMATS[INTERMEDIATE_AUDIO_FORMAT]["suffix"]
+    incoming_audio = [AUDIO_DIR / f"{v.stem}{audio_suffix}" for v in extract["process"]]
+    incoming_audio += [AUDIO_DIR / a.name for a in copy_music["process"]]
+    transcribe = plan_transcribe(incoming_audio)
+    summarize = plan_llm_stage(summary_path_for)
+    todos = plan_llm_stage(todo_path_for)
+
+    # Audio that does not exist yet gets its duration from the source it is made from
+    sources = {}
+    for video_path in extract["process"]:
+        sources[AUDIO_DIR / f"{video_path.stem}{audio_suffix}"] = video_path if video_path.exists() else OBS_DIR / video_path.name
+    sources.update({AUDIO_DIR / a.name: a for a in copy_music["process"]})
+    to_probe = [sources.get(a, a) for a in transcribe["process"]]
+    durations = durations_for(to_probe)
+    pending_seconds = sum(d for d in durations.values() if d)
+    # Unknown durations still cost one call with the bare prompt
+    pending_durations = [d or 0.0 for d in durations.values()]
+    unknown = [str(p) for p, d in durations.items() if d is None]
+
+    realtime_factor = WHISPER_REALTIME_FACTOR.get(WHISPER_MODEL, 1.0)
+    summary_tokens = estimate_tokens(summarize["process"], pending_durations,
+                                     build_summary_messages, SUMMARY_MAX_TOKENS)
+    todo_tokens = estimate_tokens(todos["process"], pending_durations,
+                                  build_todo_messages, TODO_MAX_TOKENS)
+
+    stages = {
+        "copy_obs": copy_obs,
+        "copy_music": copy_music,
+        "extract": extract,
+        "transcribe": transcribe,
+        "summarize": summarize,
+        "todos": todos,
+    }
+    return {
+        "stages": {name: {key: [str(p) for p in paths] for key, paths in stage.items()}
+                   for name, stage in stages.items()},
+        "pending_audio_seconds": round(pending_seconds, 1),
+        "unknown_duration": unknown,
+        "whisper_model": WHISPER_MODEL,
+        "estimated_transcription_seconds": round(pending_seconds * realtime_factor, 1),
+        "openai_model": OPENAI_MODEL,
+        "routing": routing_rule(),
+        "summary_tokens": summary_tokens,
+        "todo_tokens": todo_tokens,
+        "estimated_cost_usd": _sum_costs(summary_tokens["cost_usd"], todo_tokens["cost_usd"]),
+        "work_pending": any(stage["process"] for stage in stages.values()),
+    }
+
+def _sum_costs(*costs: Optional[float]) -> Optional[float]:
+    if any(cost is None for cost in costs):
+        return None
+    return round(sum(costs), 4)
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as H:MM:SS"""
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def print_plan(plan: dict, verbose: bool = False):
+    """Print the plan in the pipeline's usual emoji style"""
+    print("🧭 TRANSCRIPTBOT - PIPELINE PLAN (dry run)")
+    print("=" * 60)
+    for name, stage in plan["stages"].items():
+        print(f"\n📂 {name}: {len(stage['process'])} to process, {len(stage['skip'])} to skip")
+        for path in stage["process"]:
+            print(f"   ▶️  {Path(path).name}")
+        if verbose:
+            for path in stage["skip"]:
+                print(f"   ⏭️  {Path(path).name}")
+
+    print("\n" + "=" * 60)
+    print(f"⏱️  Pending audio: {format_duration(plan['pending_audio_seconds'])}")
+    if plan["unknown_duration"]:
+        print(f"⚠️  Unknown duration for {len(plan['unknown_duration'])} files (ffprobe missing or failed)")
+    print(f"🗣️  Estimated transcription time ({plan['whisper_model']}, CPU): "
+          f"{format_duration(plan['estimated_transcription_seconds'])}")
+    print(f"🔀 Routing: {plan['routing']}")
+    for label, key in (("Summaries", "summary_tokens"), ("TODOs", "todo_tokens")):
+        tokens = plan[key]
+        models = ", ".join(f"{count}× {model}" for model, count in sorted(tokens["models"].items()))
+        print(f"🤖 {label}: {tokens['calls']} calls ({models or 'none'}), ~{tokens['input_tokens']} input / "
+              f"≤{tokens['output_tokens']} output tokens, ≤{format_duration(tokens['seconds'])}")
+        if tokens["too_long"]:
+            print(f"   ⛔ {tokens['too_long']} transcripts exceed the model's context window and would be skipped")
+    cost = plan["estimated_cost_usd"]
+    cost_text = f"≤${cost:.2f}" if cost is not None else "unknown (no pricing)"
+    print(f"💰 Estimated OpenAI cost: {cost_text}")
+    print("✅ Nothing to do" if not plan["work_pending"] else "🚀 A pipeline run is needed")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print the plan; exit status 1 with --exit-code when work is pending"""
+    parser = argparse.ArgumentParser(description="Show what the pipeline would do without doing it")
+    parser.add_argument("--json", action="store_true", help="print the plan as JSON")
+    parser.add_argument("--verbose", "-v", action="store_true", help="also list skipped files")
+    parser.add_argument("--exit-code", action="store_true",
+                        help="exit with status 1 if a pipeline run is needed")
+    args = parser.parse_args(argv)
+
+    plan = build_plan()
+    if args.json:
+        print(json.dumps(plan, indent=2, ensure_ascii=False))
+    else:
+        print_plan(plan, verbose=args.verbose)
+
+    return 1 if args.exit_code and plan["work_pending"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
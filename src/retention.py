@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Retention policy for intermediate audio and copied videos
+Once a recording has a verified transcript, its intermediates in
+data/audio and data/video are compressed or deleted according to
+RETENTION_AUDIO / RETENTION_VIDEO in constants.py. Only copies whose
+original still exists (in ~/Videos/OBS or ~/Music) are touched, and the
+copy/extract stages skip recordings that already have a transcript, so
+nothing is re-transcribed. Without --apply only the plan is shown.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from audio_loader import media_duration
+from constants import (
+    AUDIO_DIR, VIDEO_DIR, OBS_DIR, MUSIC_DIR,
+    INTERMEDIATE_AUDIO_SUFFIXES, MUSIC_EXTENSIONS, VIDEO_EXTENSIONS,
+    RETENTION_AUDIO, RETENTION_VIDEO, RETENTION_MIN_AGE_DAYS,
+)
+from extract_audio_from_videos import AUDIO_FORMATS, encode_audio
+from transcribe_batch import existing_transcript, is_valid_transcript
+
+# Compressed audio may differ slightly in length (encoder padding)
+DURATION_TOLERANCE_SECONDS = 1.0
+
+def verified_transcript(path: Path, min_age_days: float) -> Optional[Path]:
+    """Return the transcript of a recording if it is valid and old enough"""
+    transcript_path = existing_transcript(path)
+    if transcript_path is None:
+        return None
+    if time.time() - transcript_path.stat().st_mtime < min_age_days * 86400:
+        return None
+    if not is_valid_transcript(transcript_path.read_text(encoding="utf-8")):
+        return None
+    return transcript_path
+
+def original_source(path: Path) -> Optional[Path]:
+    """Find the original a file in data/ was made from (OBS video or ~/Music file)"""
+    for video_dir in (VIDEO_DIR, OBS_DIR):
+        if not video_dir.exists():
+            continue
+        for suffix in VIDEO_EXTENSIONS:
+            candidate = video_dir / (path.stem + suffix)
+            if candidate.exists() and candidate != path:
+                return candidate
+    if path.suffix.lower() in MUSIC_EXTENSIONS and MUSIC_DIR.exists():
+        return next(MUSIC_DIR.rglob(path.name), None)
+    return None
+
+def plan_retention(audio_policy: str, video_policy: str, min_age_days: float) -> List[Tuple[str, Path, str]]:
+    """Return [(action, path, reason)] for all intermediates covered by the policy"""
+    actions = []
+    if audio_policy != "keep" and AUDIO_DIR.exists():
+        for audio_path in sorted(AUDIO_DIR.iterdir()):
+            if audio_path.suffix.lower() not in INTERMEDIATE_AUDIO_SUFFIXES:
+                continue
+            if audio_policy == "compress" and audio_path.suffix.lower() == ".opus":
+                continue
+            transcript_path = verified_transcript(audio_path, min_age_days)
+            source = original_source(audio_path)
+            if transcript_path and source:
+                actions.append((audio_policy, audio_path, f"{transcript_path.name}, original {source}"))
+
+    if video_policy == "delete" and VIDEO_DIR.exists():
+        for video_path in sorted(VIDEO_DIR.iterdir()):
+            if video_path.suffix.lower() not in VIDEO_EXTENSIONS:
+                continue
+            transcript_path = verified_transcript(video_path, min_age_days)
+            original = OBS_DIR / video_path.name
+            if transcript_path and original.exists():
+                actions.append(("delete", video_path, f"{transcript_path.name}, original {original}"))
+    return actions
+
+def compress_audio(audio_path: Path) -> Optional[Path]:
+    """Re-encode an intermediate as Opus and remove the original once verified"""
+    opus_path = audio_path.with_suffix(AUDIO_FORMATS["opus"]["suffix"])
+    tmp_path = opus_path.with_name(opus_path.name + ".tmp")
+    try:
+        encode_audio(audio_path, tmp_path, "opus")
+    except Exception as e:
+        print(f"❌ Error compressing {audio_path.name}: {e}")
+        tmp_path.unlink(missing_ok=True)
+        return None
+
+    original_duration = media_duration(audio_path)
+    compressed_duration = media_duration(tmp_path)
+    if (original_duration is None or compressed_duration is None
+            or abs(original_duration - compressed_duration) > DURATION_TOLERANCE_SECONDS):
+        print(f"❌ Compressed {audio_path.name} could not be verified - keeping original")
+        tmp_path.unlink(missing_ok=True)
+        return None
+
+    tmp_path.replace(opus_path)
+    audio_path.unlink()
+    return opus_path
+
+def format_size(n_bytes: int) -> str:
+    return f"{n_bytes / 1024 / 1024:.1f} MB"
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Show or apply the retention policy"""
+    parser = argparse.ArgumentParser(description="Compress or delete intermediates of transcribed recordings")
+    parser.add_argument("--apply", action="store_true", help="actually compress/delete files (default: dry run)")
+    parser.add_argument("--audio", choices=["keep", "compress", "delete"], default=RETENTION_AUDIO,
+                        help=f"policy for data/audio (default: {RETENTION_AUDIO})")
+    parser.add_argument("--video", choices=["keep", "delete"], default=RETENTION_VIDEO,
+                        help=f"policy for data/video (default: {RETENTION_VIDEO})")
+    parser.add_argument("--min-age-days", type=float, default=RETENTION_MIN_AGE_DAYS,
+                        help=f"minimum transcript age (default: {RETENTION_MIN_AGE_DAYS})")
+    args = parser.parse_args(argv)
+
+    print("🧹 Applying retention policy..." if args.apply else "🧹 Retention plan (dry run, use --apply)")
+    actions = plan_retention(args.audio, args.video, args.min_age_days)
+    if not actions:
+        print("✅ Nothing to clean up")
+        return 0
+
+    freed = 0
+    for action, path, reason in actions:
+        size = path.stat().st_size
+        icon = "🗜️ " if action == "compress" else "🗑️ "
+        print(f"{icon} {action} {path.name} ({format_size(size)}) – {reason}")
+        if not args.apply:
+            freed += size
+            continue
+        if action == "compress":
+            opus_path = compress_audio(path)
+            if opus_path:
+                freed += size - opus_path.stat().st_size
+        else:
+            path.unlink()
+            freed += size
+
+    verb = "Freed" if args.apply else "Would free about"
+    if not args.apply and args.audio == "compress":
+        verb = "Would free up to"
+    print(f"💾 {verb} {format_size(freed)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Local full-text search over transcripts, summaries and TODO lists
+Keeps an incrementally updated inverted index (BM25 ranking) in
+data/index/ - no external services involved.
+"""
+
+import argparse
+import gzip
+import json
+import math
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from atomic_write import atomic_write
+from constants import DATA_DIR, TRANSCRIPT_DIR, SUMMARY_DIR, TODO_DIR, SEGMENT_DIR, INDEX_DIR
+
+INDEX_PATH = INDEX_DIR / "search_index.json.gz"
+INDEX_VERSION = 1
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+SNIPPET_CHARS = 160
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens (umlauts and digits included)"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+def document_kind(path: Path) -> Optional[str]:
+    """Return 'transcript', 'summary' or 'todo' for indexable files, else None"""
+    if path.name == "README.md":
+        return None
+    parent = path.parent.resolve()
+    if parent == TRANSCRIPT_DIR.resolve() and path.suffix == ".txt":
+        return "transcript"
+    if parent == TODO_DIR.resolve() and path.name.endswith("_TODOs.md"):
+        return "todo"
+    if parent == SUMMARY_DIR.resolve() and path.suffix == ".md":
+        return "summary"
+    return None
+
+def indexable_files() -> List[Path]:
+    """All files the index should cover"""
+    files = []
+    for directory, pattern in ((TRANSCRIPT_DIR, "*.txt"), (SUMMARY_DIR, "*.md"), (TODO_DIR, "*_TODOs.md")):
+        if directory.exists():
+            files.extend(p for p in directory.glob(pattern) if document_kind(p))
+    return sorted(files)
+
+def _doc_id(path: Path) -> str:
+    return path.resolve().relative_to(DATA_DIR.resolve()).as_posix()
+
+class SearchIndex:
+    """Inverted index: term -> {doc_id: term frequency}"""
+
+    def __init__(self, docs: Optional[Dict[str, dict]] = None, postings: Optional[Dict[str, Dict[str, int]]] = None):
+        self.docs = docs or {}
+        self.postings = postings or {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "SearchIndex":
+        """Load the index from disk, or start empty if missing/outdated"""
+        path = path or INDEX_PATH
+        if not path.exists():
+            return cls()
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Search index unreadable ({e}) - rebuilding")
+            return cls()
+        if data.get("version") != INDEX_VERSION:
+            return cls()
+        return cls(data["docs"], data["postings"])
+
+    def save(self, path: Optional[Path] = None):
+        """Write the index atomically"""
+        with atomic_write(path or INDEX_PATH, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "docs": self.docs, "postings": self.postings},
+                      f, ensure_ascii=False, separators=(",", ":"))
+        self.dirty = False
+
+    def remove(self, doc_id: str):
+        """Drop a document and all its postings"""
+        if self.docs.pop(doc_id, None) is None:
+            return
+        for term in list(self.postings):
+            docs = self.postings[term]
+            if docs.pop(doc_id, None) is not None and not docs:
+                del self.postings[term]
+        self.dirty = True
+
+    def add(self, path: Path):
+        """(Re-)index one file"""
+        doc_id = _doc_id(path)
+        self.remove(doc_id)
+        stat = path.stat()
+        tokens = tokenize(path.read_text(encoding="utf-8", errors="replace"))
+        self.docs[doc_id] = {
+            "kind": document_kind(path),
+            "length": len(tokens),
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+        }
+        for term, tf in Counter(tokens).items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+        self.dirty = True
+
+    def is_current(self, path: Path) -> bool:
+        """True if the indexed version of path matches the file on disk"""
+        doc = self.docs.get(_doc_id(path))
+        if doc is None:
+            return False
+        stat = path.stat()
+        return doc["mtime"] == stat.st_mtime and doc["size"] == stat.st_size
+
+    def refresh(self) -> int:
+        """Incrementally sync the index with the data directories; returns number of changes"""
+        changes = 0
+        files = indexable_files()
+        present = {_doc_id(p) for p in files}
+        for doc_id in [d for d in self.docs if d not in present]:
+            self.remove(doc_id)
+            changes += 1
+        for path in files:
+            if not self.is_current(path):
+                self.add(path)
+                changes += 1
+        return changes
+
+    def search(self, query: str, limit: int = 10, kind: Optional[str] = None) -> List[tuple]:
+        """Return [(score, doc_id)] ranked by BM25"""
+        terms = set(tokenize(query))
+        if not terms or not self.docs:
+            return []
+        n_docs = len(self.docs)
+        avg_length = sum(d["length"] for d in self.docs.values()) / n_docs or 1
+        scores = Counter()
+        for term in terms:
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                doc = self.docs[doc_id]
+                if kind and doc["kind"] != kind:
+                    continue
+                norm = K1 * (1 - B + B * doc["length"] / avg_length)
+                scores[doc_id] += idf * tf * (K1 + 1) / (tf + norm)
+        return [(score, doc_id) for doc_id, score in scores.most_common(limit)]
+
+def update_index(paths: List[Path]):
+    """Index freshly written pipeline output; never fails the calling stage"""
+    try:
+        index = SearchIndex.load()
+        for path in paths:
+            if document_kind(path):
+                index.add(path)
+        if index.dirty:
+            index.save()
+    except Exception as e:
+        print(f"⚠️  Could not update search index: {e}")
+
+def format_timestamp(seconds: float) -> str:
+    """Format seconds as HH:MM:SS"""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def segment_path_for(transcript_path: Path) -> Path:
+    """Sidecar JSON with Whisper segments for a transcript"""
+    return SEGMENT_DIR / f"{transcript_path.stem}.json"
+
+def _best_segment_hit(path: Path, terms: set) -> Optional[str]:
+    """Snippet from the segment with the most query terms, prefixed with its start time"""
+    segment_path = segment_path_for(path)
+    if not segment_path.exists():
+        return None
+    try:
+        segments = json.loads(segment_path.read_text(encoding="utf-8"))
+    except ValueError:
+        return None
+    best, best_hits = None, 0
+    for segment in segments:
+        hits = len(terms & set(tokenize(segment.get("text", ""))))
+        if hits > best_hits:
+            best, best_hits = segment, hits
+    if best is None:
+        return None
+    return f"[{format_timestamp(best['start'])}] {best['text'].strip()}"
+
+def _text_snippet(text: str, terms: set) -> str:
+    """Window of text around the first query term occurrence"""
+    for match in TOKEN_PATTERN.finditer(text):
+        if match.group().lower() in terms:
+            start = max(0, match.start() - SNIPPET_CHARS // 2)
+            snippet = text[start:start + SNIPPET_CHARS]
+            return ("…" if start else "") + " ".join(snippet.split()) + "…"
+    return " ".join(text[:SNIPPET_CHARS].split())
+
+def snippet_for(path: Path, query: str) -> str:
+    """Best snippet for a hit: timestamped segment if available, else text window"""
+    terms = set(tokenize(query))
+    if document_kind(path) == "transcript":
+        segment_hit = _best_segment_hit(path, terms)
+        if segment_hit:
+            return segment_hit
+    return _text_snippet(path.read_text(encoding="utf-8", errors="replace"), terms)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Search the local transcript/summary/TODO index"""
+    parser = argparse.ArgumentParser(description="Full-text search over transcripts, summaries and TODOs")
+    parser.add_argument("query", nargs="*", help="search terms")
+    parser.add_argument("-n", "--limit", type=int, default=10, help="number of hits (default: 10)")
+    parser.add_argument("--kind", choices=["transcript", "summary", "todo"], help="only search one kind of file")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the index from scratch")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = SearchIndex() if args.rebuild else SearchIndex.load()
+    changes = index.refresh()
+    if index.dirty or args.rebuild:
+        index.save()
+        print(f"🗂️  Index updated ({changes} changed files, {len(index.docs)} documents)")
+
+    if not args.query:
+        return 0
+
+    query = " ".join(args.query)
+    hits = index.search(query, limit=args.limit, kind=args.kind)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if not hits:
+        print(f"🔍 No results for '{query}' ({elapsed_ms:.0f} ms)")
+        return 1
+
+    print(f"🔍 {len(hits)} results for '{query}' ({elapsed_ms:.0f} ms)\n")
+    for rank, (score, doc_id) in enumerate(hits, 1):
+        path = DATA_DIR / doc_id
+        print(f"{rank:2d}. 📄 {doc_id}  (score {score:.2f})")
+        print(f"    {snippet_for(path, query)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,16 @@
 import os
 import json
 import re
+import argparse
 from pathlib import Path
 from datetime import datetime
-import openai
-from typing import Optional
+from typing import Optional, List, Dict, TYPE_CHECKING
+
+from search_index import update_index
+from token_budget import TokenBudget, estimate_call, print_estimate_report, too_short_for_llm
+
+if TYPE_CHECKING:
+    import openai
 
 # Base directories
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
@@ -14,6 +20,9 @@ SUMMARY_DIR = DATA_DIR / "summaries"
 # Ensure summary directory exists
 SUMMARY_DIR.mkdir(parents=True, exist_ok=True)
 
+SUMMARY_MAX_TOKENS = 2000
+SUMMARY_SYSTEM_PROMPT = "Du bist ein Experte für technische Dokumentation und Meeting-Zusammenfassungen."
+
 def setup_openai_client():
     """Setup OpenAI client with API key from environment variable"""
     api_key = os.getenv('OPENAI_API_KEY')
@@ -22,6 +31,7 @@ def setup_openai_client():
         print("Set it with: export OPENAI_API_KEY='your-api-key-here'")
         return None
     
+    import openai  # imported lazily so planning never loads the SDK
     return openai.OpenAI(api_key=api_key)
 
 def create_summary_prompt(transcript_text: str, filename: str) -> str:
@@ -94,7 +104,15 @@ STRUKTUR:
 Erstelle eine professionelle, gut lesbare Zusammenfassung:
 """
 
-def summarize_transcript(client: openai.OpenAI, transcript_path: Path) -> Optional[str]:
+def build_summary_messages(transcript_text: str, filename: str) -> List[Dict[str, str]]:
+    """Chat messages for summarizing a transcript"""
+    return [
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": create_summary_prompt(transcript_text, filename)}
+    ]
+
+def summarize_transcript(client: "openai.OpenAI", transcript_path: Path,
+                         budget: Optional[TokenBudget] = None, model: Optional[str] = None) -> Optional[str]:
     """Summarize a single transcript using OpenAI"""
     
     try:
@@ -102,25 +120,29 @@ def summarize_transcript(client: openai.OpenAI, transcript_path: Path) -> Option
         transcript_text = transcript_path.read_text(encoding='utf-8')
         
         # Skip if transcript is too short
-        if len(transcript_text.strip()) < 100:
+        if too_short_for_llm(transcript_text):
             print(f"⏭️  Skipping {transcript_path.name} - too short")
             return None
         
-        print(f"📝 Summarizing {transcript_path.name}...")
+        # Create prompt and check it against the budget before sending anything
+        messages = build_summary_messages(transcript_text, transcript_path.name)
+        estimate = estimate_call(messages, SUMMARY_MAX_TOKENS, model)
+        budget = budget or TokenBudget.for_run()
+        reason = budget.check(estimate)
+        if reason:
+            print(f"⛔ Skipping {transcript_path.name} - {reason}")
+            return None
         
-        # Create prompt
-        prompt = create_summary_prompt(transcript_text, transcript_path.name)
+        print(f"📝 Summarizing {transcript_path.name} with {estimate.model} ({estimate.input_tokens} tokens)...")
         
         # Call OpenAI API
         response = client.chat.completions.create(
-            model="gpt-4",  # or "gpt-3.5-turbo" for faster/cheaper
-            messages=[
-                {"role": "system", "content": "Du bist ein Experte für technische Dokumentation und Meeting-Zusammenfassungen."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=2000,
+            model=estimate.model,
+            messages=messages,
+            max_tokens=SUMMARY_MAX_TOKENS,
             temperature=0.3
         )
+        budget.record(estimate, getattr(response, "usage", None))
         
         summary = response.choices[0].message.content
         print(f"✅ Summary created for {transcript_path.name}")
@@ -151,8 +173,8 @@ def extract_date_from_filename(filename: str) -> Optional[str]:
     
     return None
 
-def save_summary(summary: str, transcript_path: Path) -> Path:
-    """Save summary to the appropriate directory"""
+def summary_path_for(transcript_path: Path) -> Path:
+    """Return the summary path that belongs to a transcript"""
     
     # Extract date for filename
     date_from_filename = extract_date_from_filename(transcript_path.stem)
@@ -164,7 +186,13 @@ def save_summary(summary: str, transcript_path: Path) -> Path:
         # Fallback to original stem
         summary_filename = f"{transcript_path.stem}.md"
     
-    summary_path = SUMMARY_DIR / summary_filename
+    return SUMMARY_DIR / summary_filename
+
+def save_summary(summary: str, transcript_path: Path) -> Path:
+    """Save summary to the appropriate directory"""
+    
+    summary_path = summary_path_for(transcript_path)
+    summary_filename = summary_path.name
     
     # Check if summary already exists
     if summary_path.exists():
@@ -173,21 +201,35 @@ def save_summary(summary: str, transcript_path: Path) -> Path:
     # Save summary
     summary_path.write_text(summary, encoding='utf-8')
     print(f"💾 Summary saved to {summary_path}")
+    update_index([summary_path])
     
     return summary_path
 
-def main():
+def estimate_summaries(transcript_files: List[Path], model: Optional[str] = None) -> List[tuple]:
+    """[(name, CallEstimate)] for all transcripts that would be summarized"""
+    rows = []
+    for transcript_path in transcript_files:
+        transcript_text = transcript_path.read_text(encoding='utf-8')
+        if too_short_for_llm(transcript_text):
+            continue
+        messages = build_summary_messages(transcript_text, transcript_path.name)
+        rows.append((transcript_path.name, estimate_call(messages, SUMMARY_MAX_TOKENS, model)))
+    return rows
+
+def main(argv=None):
     """Main function to process all transcripts"""
     
-    print("🤖 Starting transcript summarization...")
+    parser = argparse.ArgumentParser(description="Summarize transcripts with OpenAI")
+    parser.add_argument("--estimate", action="store_true", help="only report estimated tokens, cost and time")
+    parser.add_argument("--model", help="use this model for all transcripts (disables routing)")
+    parser.add_argument("--budget-usd", type=float, help="maximum spend for this run")
+    parser.add_argument("--max-file-tokens", type=int, help="maximum tokens (input + output) per transcript")
+    args = parser.parse_args(argv)
     
-    # Setup OpenAI client
-    client = setup_openai_client()
-    if not client:
-        return
+    print("🤖 Starting transcript summarization...")
     
-    # Find all transcripts (any language)
-    transcript_files = list(TRANSCRIPT_DIR.glob("*.txt"))
+    # Find all transcripts (any language) without a summary
+    transcript_files = sorted(TRANSCRIPT_DIR.glob("*.txt"))
     
     if not transcript_files:
         print("❌ No transcript files found!")
@@ -195,25 +237,36 @@ def main():
     
     print(f"📄 Found {len(transcript_files)} transcript files")
     
-    # Process each transcript
-    success_count = 0
-    for transcript_path in sorted(transcript_files):
-        
+    pending = []
+    for transcript_path in transcript_files:
         # Check if summary already exists
-        date_from_filename = extract_date_from_filename(transcript_path.stem)
-        if date_from_filename:
-            summary_filename = f"{transcript_path.stem.split()[0]}.md"
-        else:
-            summary_filename = f"{transcript_path.stem}.md"
-        
-        summary_path = SUMMARY_DIR / summary_filename
-        
-        if summary_path.exists():
+        if summary_path_for(transcript_path).exists():
             print(f"⏭️  Summary for {transcript_path.name} already exists")
-            continue
+        else:
+            pending.append(transcript_path)
+    
+    budget = TokenBudget.for_run()
+    if args.budget_usd is not None:
+        budget.run_budget_usd = args.budget_usd
+    if args.max_file_tokens is not None:
+        budget.file_budget_tokens = args.max_file_tokens
+    
+    if pending:
+        print_estimate_report(estimate_summaries(pending, args.model), budget)
+    if args.estimate or not pending:
+        return
+    
+    # Setup OpenAI client
+    client = setup_openai_client()
+    if not client:
+        return
+    
+    # Process each transcript
+    success_count = 0
+    for transcript_path in pending:
         
         # Create summary
-        summary = summarize_transcript(client, transcript_path)
+        summary = summarize_transcript(client, transcript_path, budget, args.model)
         
         if summary:
             save_summary(summary, transcript_path)
@@ -221,7 +274,7 @@ def main():
         
         print()  # Empty line for readability
     
-    print(f"🎉 Finished! Created {success_count} new summaries")
+    print(f"🎉 Finished! Created {success_count} new summaries ({budget.summary()})")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,221 @@
+"""
+Local token counting, model routing and budgets for the LLM stages
+Counts prompt tokens locally (tiktoken if installed, otherwise a character
+heuristic), routes short prompts to the cheaper/faster model and long ones
+to the strong model, and enforces per-file and per-run budgets before any
+request is sent.
+
+The summarize and TODO stages run as separate processes. run_pipeline.py
+exports a run id, and every TokenBudget of that run books its spend into
+one ledger file, so the run budget covers all stages together.
+"""
+
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+from atomic_write import atomic_write_text
+from constants import (
+    OPENAI_MODEL, OPENAI_FAST_MODEL, OPENAI_LONG_CONTEXT_MODEL, FAST_MODEL_MAX_INPUT_TOKENS, OPENAI_PRICING,
+    MODEL_CONTEXT_TOKENS, OUTPUT_TOKENS_PER_SECOND, RUN_BUDGET_USD, FILE_BUDGET_TOKENS,
+    CHARS_PER_TOKEN, RUN_ID_ENV, RUN_LEDGER_DIR, RUN_LEDGER_MAX_AGE_HOURS, MIN_TRANSCRIPT_CHARS,
+)
+
+# Chat format overhead per message and per reply
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+_encodings = {}
+
+def _encoding(model: str):
+    """tiktoken encoding for model, or None if tiktoken is unavailable"""
+    if model in _encodings:
+        return _encodings[model]
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception:  # not installed, or BPE file not cached and no network
+        encoding = None
+    _encodings[model] = encoding
+    return encoding
+
+def count_tokens(text: str, model: str = OPENAI_MODEL) -> int:
+    """Number of tokens text uses for model"""
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+def count_message_tokens(messages: List[Dict[str, str]], model: str = OPENAI_MODEL) -> int:
+    """Prompt tokens of a chat request"""
+    return sum(count_tokens(m["content"], model) + TOKENS_PER_MESSAGE for m in messages) + TOKENS_PER_REPLY
+
+def too_short_for_llm(transcript_text: str) -> bool:
+    """True if the summary and TODO stages skip this transcript without writing output"""
+    return len(transcript_text.strip()) < MIN_TRANSCRIPT_CHARS
+
+def fits_context(model: str, input_tokens: int, max_output_tokens: int) -> bool:
+    """True if prompt plus completion fit the model's context window (unknown models: assume yes)"""
+    context = MODEL_CONTEXT_TOKENS.get(model)
+    return context is None or input_tokens + max_output_tokens <= context
+
+def route_model(input_tokens: int, max_output_tokens: int = 0) -> str:
+    """Short prompts go to the fast model, long ones to the strong model if they fit it,
+    and everything else to the long-context model"""
+    if FAST_MODEL_MAX_INPUT_TOKENS and input_tokens <= FAST_MODEL_MAX_INPUT_TOKENS:
+        return OPENAI_FAST_MODEL
+    if fits_context(OPENAI_MODEL, input_tokens, max_output_tokens):
+        return OPENAI_MODEL
+    return OPENAI_LONG_CONTEXT_MODEL
+
+def routing_rule() -> str:
+    """One-line description of route_model for reports"""
+    strong_context = MODEL_CONTEXT_TOKENS.get(OPENAI_MODEL)
+    strong = f"{OPENAI_MODEL} if it fits its {strong_context}-token context" if strong_context else OPENAI_MODEL
+    fast = f"≤{FAST_MODEL_MAX_INPUT_TOKENS} input tokens → {OPENAI_FAST_MODEL}; " if FAST_MODEL_MAX_INPUT_TOKENS else ""
+    return f"{fast}longer → {strong}, otherwise {OPENAI_LONG_CONTEXT_MODEL}"
+
+def token_cost(model: str, input_tokens: int, output_tokens: int) -> Optional[float]:
+    """USD cost of a request, or None if the model has no pricing"""
+    if model not in OPENAI_PRICING:
+        return None
+    input_price, output_price = OPENAI_PRICING[model]
+    return input_tokens / 1000 * input_price + output_tokens / 1000 * output_price
+
+class CallEstimate:
+    """Token, cost and time estimate of one request (output at its max_tokens bound)"""
+
+    def __init__(self, model: str, input_tokens: int, max_output_tokens: int):
+        self.model = model
+        self.input_tokens = input_tokens
+        self.max_output_tokens = max_output_tokens
+        self.cost = token_cost(model, input_tokens, max_output_tokens)
+        self.seconds = max_output_tokens / OUTPUT_TOKENS_PER_SECOND.get(model, 20)
+
+    @property
+    def fits_context(self) -> bool:
+        return fits_context(self.model, self.input_tokens, self.max_output_tokens)
+
+def estimate_call(messages: List[Dict[str, str]], max_tokens: int, model: Optional[str] = None) -> CallEstimate:
+    """Count the prompt locally and pick the model (unless one is forced)"""
+    input_tokens = count_message_tokens(messages, model or OPENAI_MODEL)
+    return CallEstimate(model or route_model(input_tokens, max_tokens), input_tokens, max_tokens)
+
+def start_run() -> str:
+    """Return the current run id, creating one for this process and its children if needed"""
+    if not os.getenv(RUN_ID_ENV):
+        prune_run_ledgers()
+        os.environ[RUN_ID_ENV] = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    return os.environ[RUN_ID_ENV]
+
+def prune_run_ledgers(max_age_hours: float = RUN_LEDGER_MAX_AGE_HOURS):
+    """Remove ledgers of runs that have not booked anything for max_age_hours"""
+    if not RUN_LEDGER_DIR.exists():
+        return
+    cutoff = time.time() - max_age_hours * 3600
+    for ledger_path in RUN_LEDGER_DIR.glob("*.json"):
+        try:
+            if ledger_path.stat().st_mtime < cutoff:
+                ledger_path.unlink()
+        except OSError:
+            pass  # removed by a concurrent run
+
+class TokenBudget:
+    """Per-file token limit and per-run USD limit, enforced before each request
+
+    With a run_id, the spend is shared with all other budgets of the same
+    run (other stages, other processes) through a ledger file.
+    """
+
+    def __init__(self, run_budget_usd: Optional[float] = RUN_BUDGET_USD,
+                 file_budget_tokens: Optional[int] = FILE_BUDGET_TOKENS,
+                 run_id: Optional[str] = None):
+        self.run_budget_usd = run_budget_usd
+        self.file_budget_tokens = file_budget_tokens
+        self.ledger_path = RUN_LEDGER_DIR / f"{run_id}.json" if run_id else None
+        self._spent_usd = 0.0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    @classmethod
+    def for_run(cls) -> "TokenBudget":
+        """Budget that shares its spend with the rest of the current run"""
+        return cls(run_id=start_run())
+
+    @property
+    def spent_usd(self) -> float:
+        """USD spent so far in this run (all stages) or by this budget"""
+        if self.ledger_path is None:
+            return self._spent_usd
+        try:
+            return float(json.loads(self.ledger_path.read_text(encoding="utf-8"))["spent_usd"])
+        except (OSError, ValueError, KeyError):
+            return 0.0
+
+    def _book(self, cost: float):
+        if self.ledger_path is None:
+            self._spent_usd += cost
+            return
+        # Stages of a run are sequential, so a read-modify-replace is enough
+        spent = self.spent_usd + cost
+        atomic_write_text(self.ledger_path, json.dumps({"spent_usd": spent}))
+
+    def check(self, estimate: CallEstimate) -> Optional[str]:
+        """Return why a request must not be sent, or None if it is within budget"""
+        if not estimate.fits_context:
+            return (f"{estimate.input_tokens} input tokens exceed the context window of {estimate.model} "
+                    f"({MODEL_CONTEXT_TOKENS[estimate.model]})")
+        if self.file_budget_tokens and estimate.input_tokens + estimate.max_output_tokens > self.file_budget_tokens:
+            return (f"{estimate.input_tokens} input + {estimate.max_output_tokens} output tokens exceed "
+                    f"the per-file budget of {self.file_budget_tokens}")
+        if self.run_budget_usd:
+            if estimate.cost is None:
+                return f"no pricing for {estimate.model} in OPENAI_PRICING - cannot enforce the run budget"
+            if self.spent_usd + estimate.cost > self.run_budget_usd:
+                return (f"up to ${estimate.cost:.2f} would exceed the run budget "
+                        f"(${self.spent_usd:.2f} of ${self.run_budget_usd:.2f} spent)")
+        return None
+
+    def record(self, estimate: CallEstimate, usage=None):
+        """Account a finished request, using the API's reported usage when available"""
+        input_tokens = getattr(usage, "prompt_tokens", None) or estimate.input_tokens
+        output_tokens = getattr(usage, "completion_tokens", None) or estimate.max_output_tokens
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self._book(token_cost(estimate.model, input_tokens, output_tokens) or 0.0)
+
+    def summary(self) -> str:
+        scope = " in this run" if self.ledger_path else ""
+        return f"{self.input_tokens} input / {self.output_tokens} output tokens, ${self.spent_usd:.2f} spent{scope}"
+
+def print_estimate_report(rows: List[tuple], budget: TokenBudget):
+    """Print a pre-run report of [(name, CallEstimate)] and the budget verdict per file"""
+    print(f"🔀 Routing: {routing_rule()}")
+    print(f"{'File':<48} {'Model':<14} {'Input':>8} {'≤Output':>8} {'≤Cost':>8} {'≤Time':>7}")
+    total_cost, total_seconds, total_input, total_output = 0.0, 0.0, 0, 0
+    unknown_cost = False
+    simulated = TokenBudget(budget.run_budget_usd, budget.file_budget_tokens)
+    simulated._spent_usd = budget.spent_usd
+    for name, estimate in rows:
+        cost_text = f"${estimate.cost:.3f}" if estimate.cost is not None else "?"
+        print(f"{name[:48]:<48} {estimate.model:<14} {estimate.input_tokens:>8} "
+              f"{estimate.max_output_tokens:>8} {cost_text:>8} {estimate.seconds:>6.0f}s")
+        reason = simulated.check(estimate)
+        if reason:
+            print(f"   ⛔ would be skipped: {reason}")
+            continue
+        simulated.record(estimate)
+        total_input += estimate.input_tokens
+        total_output += estimate.max_output_tokens
+        total_seconds += estimate.seconds
+        if estimate.cost is None:
+            unknown_cost = True
+        else:
+            total_cost += estimate.cost
+    cost_text = f"${total_cost:.2f}" + (" + unpriced models" if unknown_cost else "")
+    print(f"📊 Total: {total_input} input / ≤{total_output} output tokens, ≤{cost_text}, "
+          f"≤{total_seconds / 60:.1f} min")
@@ -1,118 +1,237 @@
-import whisper
 from pathlib import Path
+from typing import Dict, List, Optional
+import json
 import re
 
-# Base directory relative to src/
-DATA_DIR = Path(__file__).resolve().parent.parent / "data"
-AUDIO_DIR = DATA_DIR / "audio"
+from constants import (
+    AUDIO_DIR, TRANSCRIPT_DIR, AUDIO_EXTENSIONS, TRANSCRIPT_LANGUAGES,
+    WHISPER_MODEL, DEDUPLICATE_RECORDINGS, BATCH_TRANSCRIPTION, BATCH_MAX_FILE_SECONDS,
+)
+from atomic_write import atomic_write_text
+from audio_fingerprint import linked_stems
+from audio_loader import media_duration, transcribe_audio
+from search_index import segment_path_for, update_index
+from transcription_checkpoint import discard_checkpoints
 
-# Output directory for transcripts with auto-detected language
-TRANSCRIPT_DIR = DATA_DIR / "transcripts"
-TRANSCRIPT_DIR.mkdir(parents=True, exist_ok=True)
 
-# Load Whisper model
-print("🤖 Loading Whisper model...")
-model = whisper.load_model("base")  # Alternative: "small", "medium", "large"
+def load_model(name: str = WHISPER_MODEL):
+    """Load the Whisper model (imports whisper/torch lazily)"""
+    import whisper
+
+    print("🤖 Loading Whisper model...")
+    return whisper.load_model(name)
 
 def is_valid_transcript(text):
     """Check if the transcript contains actual text rather than progress indicators."""
     if not text or len(text.strip()) < 10:
         return False
-    
+
     # Check for progress indicators (like "1.5% 1.5% 1.5%...")
     if re.match(r'^[\s\d\.%]*$', text.strip()):
         return False
-    
+
     # Check for repeating test patterns
     words = text.strip().split()
     if len(words) > 10 and len(set(words)) < 5:  # Too many repeated words
         return False
-    
+
     return True
 
-# Supported audio formats
-audio_extensions = ["*.wav", "*.m4a", "*.mp3", "*.mp4", "*.flac", "*.aac"]
-
-# Collect all audio files
-audio_files = []
-for extension in audio_extensions:
-    audio_files.extend(AUDIO_DIR.glob(extension))
-
-print(f"🎵 Found {len(audio_files)} audio files to process")
-
-# Process all audio files with language detection limited to German and English
-for audio_path in audio_files:
-    # Check if transcript already exists with either language suffix
-    output_txt_de = TRANSCRIPT_DIR / f"{audio_path.stem}_de.txt"
-    output_txt_en = TRANSCRIPT_DIR / f"{audio_path.stem}_en.txt"
-    
-    if not output_txt_de.exists() and not output_txt_en.exists():
-        print(f"📝 Transcribing {audio_path.name} (detecting German/English only)...")
-        
-        try:
-            # First, try automatic detection but limit to German/English
-            print("🔍 Trying automatic detection...")
-            result = model.transcribe(str(audio_path), verbose=False)
-            detected_language = result.get('language', 'unknown')
-            
-            print(f"🌍 Detected language: {detected_language}")
-            
-            # If detected language is not German or English, try both explicitly
-            if detected_language not in ['de', 'en']:
-                print(f"⚠️  Language '{detected_language}' not supported. Trying German first...")
-                
-                # Try German first (most common in your recordings)
-                result_de = model.transcribe(str(audio_path), language='de', verbose=False)
-                text_de = result_de.get("text", "").strip()
-                
-                if is_valid_transcript(text_de):
-                    result = result_de
-                    detected_language = 'de'
-                    print("✅ German transcription successful")
+def find_audio_files(audio_dir: Path = AUDIO_DIR) -> List[Path]:
+    """Collect all supported audio files"""
+    audio_files = []
+    for extension in AUDIO_EXTENSIONS:
+        audio_files.extend(audio_dir.glob(f"*{extension}"))
+    return audio_files
+
+def existing_transcript(audio_path: Path) -> Optional[Path]:
+    """Return the transcript for audio_path if one exists with any language suffix
+
+    Duplicates of another recording (see audio_fingerprint.py) are linked to
+    the transcript of that recording, following chains of links to the end.
+    The end of the chain wins, so a snippet whose meeting was transcribed in
+    full later resolves to the full transcript.
+    """
+    for stem in reversed(linked_stems(audio_path.stem)):
+        for language in TRANSCRIPT_LANGUAGES:
+            transcript_path = TRANSCRIPT_DIR / f"{stem}_{language}.txt"
+            if transcript_path.exists():
+                return transcript_path
+    return None
+
+def link_duplicates(pending: List[Path], audio_files: List[Path]) -> Dict[str, str]:
+    """Fingerprint pending recordings and link duplicates instead of transcribing them"""
+    from audio_fingerprint import cached_fingerprint_stems, find_duplicates, load_duplicates, save_duplicates
+
+    transcribed = [a for a in audio_files if a not in pending]
+    # Recordings whose audio was already removed by the retention policy
+    known_stems = {a.stem for a in audio_files}
+    transcribed += [AUDIO_DIR / f"{stem}.wav" for stem in cached_fingerprint_stems()
+                    if stem not in known_stems and existing_transcript(AUDIO_DIR / f"{stem}.wav")]
+
+    print(f"🔎 Fingerprinting {len(pending)} new recordings to detect duplicates...")
+    duplicates = find_duplicates(pending, transcribed)
+    if duplicates:
+        manifest = load_duplicates()
+        manifest.update(duplicates)
+        save_duplicates(manifest)
+        pending_stems = {a.stem for a in pending}
+        for duplicate, canonical in sorted(duplicates.items()):
+            if duplicate in pending_stems:
+                print(f"🔗 {duplicate} is the same recording as {canonical} – linking instead of transcribing")
+            else:
+                print(f"🔗 {canonical} covers {duplicate} better – transcribing it and linking {duplicate} to it")
+    return duplicates
+
+def save_segments(segments: List[dict], transcript_path: Path) -> Path:
+    """Save Whisper segment timestamps next to the transcript (used by search)"""
+    segment_path = segment_path_for(transcript_path)
+    data = [{"start": round(s["start"], 2), "end": round(s["end"], 2), "text": s["text"]} for s in segments]
+    atomic_write_text(segment_path, json.dumps(data, ensure_ascii=False))
+    return segment_path
+
+def save_transcript(audio_path: Path, result: dict, language: str) -> Optional[Path]:
+    """Validate a transcription result and save transcript, segments and index entry"""
+    # Get the actual text content
+    text = result.get("text", "").strip()
+
+    if not text:
+        print(f"❌ Empty transcription for {audio_path.name}")
+        return None
+
+    # Validate the transcript
+    if not is_valid_transcript(text):
+        print(f"❌ Invalid transcript content for {audio_path.name} (contains only progress indicators or repeated words)")
+        return None
+
+    # Create output filename with language suffix
+    output_txt_with_lang = TRANSCRIPT_DIR / f"{audio_path.stem}_{language}.txt"
+
+    # Save segments first and the transcript atomically - the transcript marks the file as done
+    save_segments(result.get("segments", []), output_txt_with_lang)
+    atomic_write_text(output_txt_with_lang, text)
+    update_index([output_txt_with_lang])
+
+    print(f"✅ Saved transcript to {output_txt_with_lang}")
+    if "speech_seconds" in result:
+        skipped = result["total_seconds"] - result["speech_seconds"]
+        share = skipped / result["total_seconds"] * 100 if result["total_seconds"] else 0
+        print(f"🔇 Skipped {skipped / 60:.1f} of {result['total_seconds'] / 60:.1f} minutes as non-speech ({share:.0f}%)")
+    print(f"📏 Text length: {len(text)} characters")
+    print(f"🔤 First 100 characters: {text[:100]}...")
+    return output_txt_with_lang
+
+def transcribe_file(model, audio_path: Path) -> Optional[Path]:
+    """Transcribe one file with language detection limited to German and English"""
+    print(f"📝 Transcribing {audio_path.name} (detecting German/English only)...")
+
+    try:
+        # First, try automatic detection but limit to German/English
+        print("🔍 Trying automatic detection...")
+        result = transcribe_audio(model, audio_path, resumable=True)
+        detected_language = result.get('language', 'unknown')
+
+        print(f"🌍 Detected language: {detected_language}")
+
+        # If detected language is not German or English, try both explicitly
+        if detected_language not in TRANSCRIPT_LANGUAGES:
+            print(f"⚠️  Language '{detected_language}' not supported. Trying German first...")
+
+            # Try German first (most common in your recordings)
+            result_de = transcribe_audio(model, audio_path, language='de', resumable=True)
+            text_de = result_de.get("text", "").strip()
+
+            if is_valid_transcript(text_de):
+                result = result_de
+                detected_language = 'de'
+                print("✅ German transcription successful")
+            else:
+                print("❌ German failed, trying English...")
+                # Try English as fallback
+                result_en = transcribe_audio(model, audio_path, language='en', resumable=True)
+                text_en = result_en.get("text", "").strip()
+
+                if is_valid_transcript(text_en):
+                    result = result_en
+                    detected_language = 'en'
+                    print("✅ English transcription successful")
                 else:
-                    print("❌ German failed, trying English...")
-                    # Try English as fallback
-                    result_en = model.transcribe(str(audio_path), language='en', verbose=False)
-                    text_en = result_en.get("text", "").strip()
-                    
-                    if is_valid_transcript(text_en):
-                        result = result_en
-                        detected_language = 'en'
-                        print("✅ English transcription successful")
-                    else:
-                        print("❌ Both German and English failed")
-                        continue
-            
-            # Get the actual text content
-            text = result.get("text", "").strip()
-            
-            if not text:
-                print(f"❌ Empty transcription for {audio_path.name}")
-                continue
-            
-            # Validate the transcript
-            if not is_valid_transcript(text):
-                print(f"❌ Invalid transcript content for {audio_path.name} (contains only progress indicators or repeated words)")
-                continue
-            
-            # Create output filename with language suffix
-            output_txt_with_lang = TRANSCRIPT_DIR / f"{audio_path.stem}_{detected_language}.txt"
-            
-            # Save the transcript
-            output_txt_with_lang.write_text(text, encoding='utf-8')
-            
-            print(f"✅ Saved transcript to {output_txt_with_lang}")
-            print(f"� Text length: {len(text)} characters")
-            print(f"🔤 First 100 characters: {text[:100]}...")
-            
-        except Exception as e:
-            print(f"❌ Error transcribing {audio_path.name}: {e}")
-            
-    else:
-        # Show which transcript already exists
-        if output_txt_de.exists():
-            print(f"⏭️  {audio_path.name} – German transcript already exists.")
-        elif output_txt_en.exists():
-            print(f"⏭️  {audio_path.name} – English transcript already exists.")
-
-print(f"\n🎉 Transcription completed! Check {TRANSCRIPT_DIR} for results.")
\ No newline at end of file
+                    print("❌ Both German and English failed")
+                    discard_checkpoints(audio_path)
+                    return None
+
+        transcript_path = save_transcript(audio_path, result, detected_language)
+        discard_checkpoints(audio_path)
+        return transcript_path
+
+    except Exception as e:
+        # Checkpoints are kept, so the next run resumes instead of starting over
+        print(f"❌ Error transcribing {audio_path.name}: {e}")
+        return None
+
+def transcribe_short_files(model, pending: List[Path]) -> List[Path]:
+    """Transcribe short recordings in shared batches; returns the files still to do one by one
+
+    Files that fail validation in the batch (e.g. a language that needs the
+    German/English retry) go through transcribe_file like long recordings.
+    """
+    durations = {audio_path: media_duration(audio_path) for audio_path in pending}
+    short = [a for a in pending if durations[a] is not None and durations[a] <= BATCH_MAX_FILE_SECONDS]
+    if len(short) < 2:
+        return pending
+
+    print(f"📦 Batch-transcribing {len(short)} recordings of up to {BATCH_MAX_FILE_SECONDS // 60} minutes...")
+    from batched_transcription import transcribe_many
+
+    remaining = [a for a in pending if a not in short]
+    for audio_path, result in transcribe_many(model, short).items():
+        if result is None or save_transcript(audio_path, result, result["language"]) is None:
+            print(f"🔁 Transcribing {audio_path.name} again on its own")
+            remaining.append(audio_path)
+    return remaining
+
+def main():
+    """Transcribe every audio file that has no transcript yet"""
+
+    # Output directory for transcripts with auto-detected language
+    TRANSCRIPT_DIR.mkdir(parents=True, exist_ok=True)
+
+    audio_files = find_audio_files()
+    print(f"🎵 Found {len(audio_files)} audio files to process")
+
+    # Only load the model if there is actually something to transcribe
+    pending = []
+    for audio_path in audio_files:
+        transcript_path = existing_transcript(audio_path)
+        if transcript_path:
+            language = "German" if transcript_path.stem.endswith("_de") else "English"
+            print(f"⏭️  {audio_path.name} – {language} transcript already exists.")
+        else:
+            pending.append(audio_path)
+
+    duplicates, linked = {}, []
+    if pending and DEDUPLICATE_RECORDINGS:
+        duplicates = link_duplicates(pending, audio_files)
+        linked = [a for a in pending if a.stem in duplicates]
+        pending = [a for a in pending if a.stem not in duplicates]
+
+    model = None
+    if pending:
+        model = load_model()
+        if BATCH_TRANSCRIPTION:
+            pending = transcribe_short_files(model, pending)
+        for audio_path in pending:
+            transcribe_file(model, audio_path)
+
+    # Fall back to a duplicate if the recording it was linked to has no transcript
+    # (also when nothing else was pending, so a bad link can't block it forever)
+    for audio_path in linked:
+        if existing_transcript(audio_path) is None:
+            print(f"⚠️  {duplicates[audio_path.stem]} produced no transcript – transcribing {audio_path.name} instead")
+            model = model or load_model()
+            transcribe_file(model, audio_path)
+
+    print(f"\n🎉 Transcription completed! Check {TRANSCRIPT_DIR} for results.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Resumable transcription of long recordings
+While a file is transcribed window by window, the committed segments, the
+decode position, the detected language and the speech spans are written
+to data/transcripts/checkpoints/ at regular intervals. The write is
+atomic (temp file, fsync, rename), so a run killed at any moment - OOM,
+reboot, Ctrl-C, preempted node - leaves either the previous or the new
+checkpoint. The next run continues from there with the same language and
+prompt context; a checkpoint made with other settings or for a changed
+file is ignored.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Optional
+
+from atomic_write import atomic_write
+from constants import CHECKPOINT_DIR, CHECKPOINT_INTERVAL_SECONDS, TRANSCRIPT_LANGUAGES, WHISPER_MODEL
+
+class TranscriptionCheckpoint:
+    """Checkpoint of one transcription attempt (one file, one requested language)"""
+
+    def __init__(self, audio_path: Path, language: Optional[str] = None, settings: Optional[dict] = None):
+        self.audio_path = audio_path
+        self.path = checkpoint_path_for(audio_path, language)
+        stat = audio_path.stat()
+        self.identity = dict(settings or {}, audio=audio_path.name, size=stat.st_size, mtime=stat.st_mtime,
+                             language=language, model=WHISPER_MODEL)
+        self.last_save = time.monotonic()
+
+    def load(self) -> Optional[dict]:
+        """Return the saved state if it belongs to this file and these settings"""
+        if not self.path.exists():
+            return None
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except ValueError:
+            return None
+        if data.get("identity") != self.identity:
+            print(f"⚠️  Ignoring checkpoint for {self.audio_path.name} (file or settings changed)")
+            return None
+        state = data["state"]
+        print(f"♻️  Resuming {self.audio_path.name} after {state['position_seconds'] / 60:.1f} minutes "
+              f"({len(state['segments'])} segments, language {state['language'] or 'not detected yet'})")
+        return state
+
+    def save(self, state: dict, force: bool = False):
+        """Write state atomically, at most every CHECKPOINT_INTERVAL_SECONDS unless forced"""
+        if not force and time.monotonic() - self.last_save < CHECKPOINT_INTERVAL_SECONDS:
+            return
+        with atomic_write(self.path) as f:
+            json.dump({"identity": self.identity, "state": state}, f, ensure_ascii=False)
+        self.last_save = time.monotonic()
+
+def checkpoint_path_for(audio_path: Path, language: Optional[str] = None) -> Path:
+    return CHECKPOINT_DIR / f"{audio_path.stem}.{language or 'auto'}.json"
+
+def discard_checkpoints(audio_path: Path):
+    """Remove all checkpoints of a recording once it is finished"""
+    for language in [None] + TRANSCRIPT_LANGUAGES:
+        checkpoint_path_for(audio_path, language).unlink(missing_ok=True)
@@ -0,0 +1,125 @@
+"""
+Energy/spectral voice activity detection in front of Whisper
+OBS recordings contain long stretches of silence, screen sharing without
+talking and breaks. Whisper spends full compute on them and tends to
+hallucinate text there. This detector finds speech spans cheaply on the
+CPU; only those are transcribed, and timestamps are mapped back to the
+original timeline.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import List, Tuple
+
+from audio_loader import SAMPLE_RATE, pcm_to_float
+
+FRAME_SAMPLES = 480   # 30 ms
+BLOCK_FRAMES = 2000   # frames analysed at once (60 s) to bound memory
+
+# A frame is speech if it is this much louder than the noise floor ...
+SPEECH_ABOVE_NOISE_DB = 10.0
+MIN_SPEECH_DB = -55.0
+# ... and most of its energy lies in the speech band
+SPEECH_BAND_HZ = (300, 3400)
+MIN_SPEECH_BAND_RATIO = 0.5
+
+# Only pauses longer than this are cut; spans keep some padding for Whisper
+MIN_SILENCE_SECONDS = 2.0
+MIN_SPEECH_SECONDS = 0.25
+PADDING_SECONDS = 0.5
+
+def frame_features(pcm):
+    """Per-frame level (dBFS) and speech-band energy ratio, computed block by block"""
+    import numpy as np
+
+    freqs = np.fft.rfftfreq(FRAME_SAMPLES, 1 / SAMPLE_RATE)
+    in_band = (freqs >= SPEECH_BAND_HZ[0]) & (freqs <= SPEECH_BAND_HZ[1])
+    levels, ratios = [], []
+    block_samples = BLOCK_FRAMES * FRAME_SAMPLES
+    for start in range(0, len(pcm) - FRAME_SAMPLES + 1, block_samples):
+        block = pcm_to_float(pcm[start:start + block_samples])
+        n_frames = len(block) // FRAME_SAMPLES
+        frames = block[:n_frames * FRAME_SAMPLES].reshape(n_frames, FRAME_SAMPLES)
+        power = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+        total = power.sum(axis=1) + 1e-12
+        levels.append(10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-12))
+        ratios.append(power[:, in_band].sum(axis=1) / total)
+    if not levels:
+        return np.zeros(0), np.zeros(0)
+    return np.concatenate(levels), np.concatenate(ratios)
+
+def detect_speech(pcm) -> List[Tuple[int, int]]:
+    """Return speech spans as [(start sample, end sample)] in the original timeline"""
+    import numpy as np
+
+    levels, ratios = frame_features(pcm)
+    if len(levels) == 0:
+        return [(0, len(pcm))] if len(pcm) else []
+
+    noise_floor = np.percentile(levels, 10)
+    threshold = max(noise_floor + SPEECH_ABOVE_NOISE_DB, MIN_SPEECH_DB)
+    speech = (levels > threshold) & (ratios > MIN_SPEECH_BAND_RATIO)
+
+    frame_seconds = FRAME_SAMPLES / SAMPLE_RATE
+    spans = []
+    for index in np.flatnonzero(speech):
+        start, end = index * frame_seconds, (index + 1) * frame_seconds
+        if spans and start - spans[-1][1] < MIN_SILENCE_SECONDS:
+            spans[-1][1] = end
+        else:
+            spans.append([start, end])
+
+    total_seconds = len(pcm) / SAMPLE_RATE
+    padded = []
+    for start, end in spans:
+        if end - start < MIN_SPEECH_SECONDS:
+            continue
+        start, end = max(0.0, start - PADDING_SECONDS), min(total_seconds, end + PADDING_SECONDS)
+        if padded and start <= padded[-1][1]:
+            padded[-1][1] = end
+        else:
+            padded.append([start, end])
+    return [(int(start * SAMPLE_RATE), int(end * SAMPLE_RATE)) for start, end in padded]
+
+class SpeechView:
+    """Sliceable view of only the speech spans of a PCM array
+
+    Behaves like a shorter int16 array (len() and [a:b]) so the windowed
+    transcription can run on it unchanged; to_original() maps times back.
+    """
+
+    def __init__(self, pcm, spans: List[Tuple[int, int]]):
+        self.pcm = pcm
+        self.spans = spans
+        self.offsets = []  # start of each span in the compacted timeline
+        total = 0
+        for start, end in spans:
+            self.offsets.append(total)
+            total += end - start
+        self.length = total
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, item):
+        import numpy as np
+
+        start, stop, _ = item.indices(self.length)
+        pieces = []
+        for (span_start, span_end), offset in zip(self.spans, self.offsets):
+            low, high = max(start, offset), min(stop, offset + span_end - span_start)
+            if low < high:
+                pieces.append(self.pcm[span_start + low - offset:span_start + high - offset])
+        return np.concatenate(pieces) if pieces else np.zeros(0, dtype="<i2")
+
+    def to_original(self, seconds: float, is_end: bool = False) -> float:
+        """Map a time in the compacted timeline to the original recording
+
+        A time exactly on a span boundary maps to the end of the earlier span
+        for segment ends and to the start of the later span otherwise.
+        """
+        if not self.spans:
+            return seconds
+        sample = seconds * SAMPLE_RATE
+        search = bisect_left if is_end else bisect_right
+        index = max(0, search(self.offsets, sample) - 1)
+        return (self.spans[index][0] + sample - self.offsets[index]) / SAMPLE_RATE
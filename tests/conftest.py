@@ -0,0 +1,28 @@
+"""
+Shared test setup
+The scripts in src/ import each other by module name, so src/ goes on the
+path. data_dir moves every data path the loaded modules know about into a
+temporary directory, so tests never touch the real data/.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point all module-level paths below data/ to tmp_path/data"""
+    from constants import DATA_DIR
+
+    data_dir = tmp_path / "data"
+    for module in list(sys.modules.values()):
+        if not getattr(module, "__file__", None) or Path(module.__file__).resolve().parent != SRC_DIR:
+            continue
+        for name, value in list(vars(module).items()):
+            if isinstance(value, Path) and value.is_relative_to(DATA_DIR):
+                monkeypatch.setattr(module, name, data_dir / value.relative_to(DATA_DIR))
+    return data_dir
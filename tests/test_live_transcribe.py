@@ -0,0 +1,91 @@
+"""
+Live transcription of a file that is still being written
+A WAV is written in chunks from a thread (like OBS does), followed with
+follow_pcm and transcribed by a stub model. Segments must reach the .part
+file while the writer is still running, and the idle timeout must promote
+it to the final <stem>_<lang>.txt.
+"""
+
+import shutil
+import struct
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("ffmpeg")
+if shutil.which("ffmpeg") is None:
+    pytest.skip("ffmpeg binary not installed", allow_module_level=True)
+
+from audio_loader import SAMPLE_RATE
+from live_transcribe import LiveTranscriber, follow_pcm
+
+CHUNK_SECONDS = 5
+IDLE_TIMEOUT = 2.0
+
+class StubModel:
+    """Returns one segment per 5 s of audio with distinct words"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, audio, language=None, initial_prompt=None, verbose=None):
+        self.calls += 1
+        seconds = len(audio) / SAMPLE_RATE
+        segments = []
+        for start in range(0, int(seconds), 5):
+            text = f" Fenster {self.calls} Abschnitt {start} besprochen"
+            segments.append({"start": float(start), "end": min(start + 5.0, seconds), "text": text})
+        return {"language": language, "segments": segments}
+
+def streaming_wav_header() -> bytes:
+    """16 kHz mono s16le header with placeholder sizes, as written by a recorder in progress"""
+    fmt = struct.pack("<HHIIHH", 1, 1, SAMPLE_RATE, SAMPLE_RATE * 2, 2, 16)
+    return (b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+            + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+            + b"data" + struct.pack("<I", 0xFFFFFFFF))
+
+def tone(seconds: float):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (6000 * np.sin(2 * np.pi * 700 * t)).astype("<i2").tobytes()
+
+def test_growing_wav_is_transcribed_while_written_and_promoted(tmp_path, data_dir):
+    recording = tmp_path / "meeting.wav"
+    recording.write_bytes(streaming_wav_header())
+    part_seen = threading.Event()
+
+    def writer():
+        with recording.open("ab") as f:
+            for i in range(16):  # 80 s of audio
+                f.write(tone(CHUNK_SECONDS))
+                f.flush()
+                if i == 7:
+                    # Hold the rest back until the first window reached the .part file
+                    part_seen.wait(timeout=30)
+                time.sleep(0.05)
+
+    transcript_dir = data_dir / "transcripts"
+    transcriber = LiveTranscriber(StubModel(), recording.stem, language="de")
+    thread = threading.Thread(target=writer)
+    thread.start()
+
+    part_during_write = None
+    for chunk in follow_pcm(recording, idle_timeout=IDLE_TIMEOUT):
+        transcriber.feed(chunk)
+        if part_during_write is None and transcriber.part_path and thread.is_alive():
+            part_during_write = transcriber.part_path.read_text(encoding="utf-8")
+            part_seen.set()
+    thread.join()
+
+    assert part_during_write, "no segments were appended while the file was still written"
+    assert transcriber.part_path == transcript_dir / "meeting_de.txt.part"
+
+    transcript_path = transcriber.finish()
+    assert transcript_path == transcript_dir / "meeting_de.txt"
+    assert not (transcript_dir / "meeting_de.txt.part").exists()
+    text = transcript_path.read_text(encoding="utf-8")
+    assert text.startswith(part_during_write.strip())
+    assert transcriber.segments[-1]["end"] == pytest.approx(80.0, abs=1.0)
+    assert (transcript_dir / "segments" / "meeting_de.json").exists()
+    assert (data_dir / "index" / "search_index.json.gz").exists()
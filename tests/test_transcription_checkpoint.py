@@ -0,0 +1,91 @@
+"""
+Resuming an interrupted transcription from its checkpoint
+A stub model stands in for Whisper. A run that dies mid-file and is
+started again must end with the same segments as an uninterrupted run,
+and every resumed window must get the same language and prompt context.
+A checkpoint of a changed file or of other settings must be ignored.
+"""
+
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import transcription_checkpoint
+from audio_loader import SAMPLE_RATE, open_pcm, transcribe_pcm
+from transcription_checkpoint import TranscriptionCheckpoint, checkpoint_path_for
+
+SECONDS = 150
+SETTINGS = {"vad": False, "window": 30, "holdback": 5}
+
+class StubModel:
+    """One segment per 5 s whose text depends on the audio, so positions must match exactly"""
+
+    def __init__(self, fail_on_call=None, error=RuntimeError):
+        self.calls = []
+        self.fail_on_call = fail_on_call
+        self.error = error
+
+    def transcribe(self, audio, language=None, initial_prompt=None, verbose=None):
+        if len(self.calls) + 1 == self.fail_on_call:
+            raise self.error("killed")
+        self.calls.append((language, initial_prompt))
+        seconds = len(audio) / SAMPLE_RATE
+        segments = []
+        for start in range(0, int(np.ceil(seconds)), 5):
+            block = audio[start * SAMPLE_RATE:(start + 1) * SAMPLE_RATE]
+            text = f" Pegel {int(round(np.abs(block).max() * 327.68))}"
+            segments.append({"start": float(start), "end": min(start + 5.0, seconds), "text": text})
+        return {"language": "de", "segments": segments}
+
+@pytest.fixture
+def recording(tmp_path, data_dir, monkeypatch):
+    """16 kHz mono WAV whose loudness rises every second"""
+    monkeypatch.setattr(transcription_checkpoint, "CHECKPOINT_INTERVAL_SECONDS", 0)
+    t = np.arange(SECONDS * SAMPLE_RATE) / SAMPLE_RATE
+    samples = (100 * (np.floor(t) + 1) * np.sin(2 * np.pi * 700 * t)).astype("<i2")
+    path = tmp_path / "meeting.wav"
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(samples.tobytes())
+    return path
+
+def transcribe(model, path, settings=SETTINGS):
+    checkpoint = TranscriptionCheckpoint(path, None, settings)
+    return transcribe_pcm(model, open_pcm(path), use_vad=False, checkpoint=checkpoint)
+
+@pytest.mark.parametrize("error", [RuntimeError, KeyboardInterrupt])
+def test_interrupted_run_resumes_with_same_segments_and_context(recording, error):
+    reference_model = StubModel()
+    reference = transcribe(reference_model, recording)
+    checkpoint_path_for(recording).unlink()
+
+    with pytest.raises(error):
+        transcribe(StubModel(fail_on_call=4, error=error), recording)
+    assert checkpoint_path_for(recording).exists()
+
+    resumed_model = StubModel()
+    resumed = transcribe(resumed_model, recording)
+
+    assert resumed["segments"] == reference["segments"]
+    assert resumed["language"] == reference["language"] == "de"
+    # The resumed run decodes only the remaining windows, with the prompts of the full run
+    assert resumed_model.calls == reference_model.calls[3:]
+    assert resumed_model.calls[0][1]  # prompt context restored from the checkpoint
+
+def test_checkpoint_of_changed_file_or_settings_is_ignored(recording):
+    with pytest.raises(RuntimeError):
+        transcribe(StubModel(fail_on_call=3), recording)
+
+    assert TranscriptionCheckpoint(recording, None, SETTINGS).load() is not None
+    assert TranscriptionCheckpoint(recording, None, dict(SETTINGS, vad=True)).load() is None
+    assert TranscriptionCheckpoint(recording, "en", SETTINGS).load() is None
+
+    with recording.open("ab") as f:
+        f.write(bytes(SAMPLE_RATE * 2))
+    model = StubModel()
+    transcribe(model, recording)
+    assert model.calls[0] == (None, None)  # started from the beginning